@@ -1,8 +1,13 @@
+import os
+
 from app import create_app
 
 app = create_app()
 
 if __name__ == "__main__":
-    #app.run()
-    print(app.url_map)
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Solo desarrollo: en producción se sirve con gunicorn (ver wsgi.py / gunicorn.conf.py)
+    app.run(
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "5000")),
+        debug=os.getenv("FLASK_DEBUG", "0") == "1",
+    )
@@ -1,45 +1,92 @@
+import importlib
 import os
+import threading
+import time
 from flask import Flask
 from .config import AppConfig
+from .utils.assets import init_assets
+from .utils.formatting import numfmt
+from .utils.fragments import render_fragment
+from .utils.logs import get_logger, setup_logging
+from .utils.metrics import init_metrics
+from .utils.resilience import UpstreamUnavailable, upstream_unavailable_response
+
+log = get_logger("app")
+
+_BLUEPRINTS = (
+    ("dashboard", "/"),
+    ("cases", "/cases"),
+    ("sla", "/sla"),
+    ("config_bp", "/config"),
+    ("chat", "/chat"),
+    ("batch", "/api"),
+)
+
+
+def load_blueprints(app):
+    """
+    Importa y registra los blueprints de `_BLUEPRINTS` (una sola vez por app).
+    Con WEB_LAZY_BLUEPRINTS lo hace el primer request; se puede llamar antes
+    para cargarlos de entrada (wsgi.py con preload, scripts que usan url_for).
+    """
+    state = app.extensions["lazy_blueprints"]
+    if state["loaded"]:
+        return
+    with state["lock"]:
+        if state["loaded"]:
+            return
+        t_total = time.perf_counter()
+        for module, url_prefix in _BLUEPRINTS:
+            t0 = time.perf_counter()
+            bp = importlib.import_module(f".blueprints.{module}", __name__).bp
+            app.register_blueprint(bp, url_prefix=url_prefix)
+            log.debug("blueprint %s cargado en %.1f ms", module, (time.perf_counter() - t0) * 1000)
+        state["loaded"] = True
+        log.info("blueprints cargados en %.1f ms", (time.perf_counter() - t_total) * 1000)
+
+
+class _LazyBlueprints:
+    """
+    Middleware WSGI: carga los blueprints antes de que Flask despache el
+    primer request. Corre por fuera de Flask, así que el registro todavía
+    está permitido (Flask 3 lo prohíbe una vez atendido un request); los
+    threads que llegan mientras tanto esperan al lock de load_blueprints.
+    """
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if not self.app.extensions["lazy_blueprints"]["loaded"]:
+            load_blueprints(self.app)
+        return self.wsgi_app(environ, start_response)
+
 
 def create_app():
     app = Flask(__name__, template_folder="templates", static_folder="static")
 
-    @app.template_filter('numfmt')
-    def numfmt(value, decimals=0):
-        """
-        Formatea números con formato latam:
-        - 8837.24  -> 8.837,24
-        - 705000   -> 705.000
-        """
-        try:
-            n = float(value)
-        except (TypeError, ValueError):
-            return value
-
-        fmt = f"{{:,.{decimals}f}}"   # 8837.24 -> "8,837.24"
-        s = fmt.format(n)
-        # Cambiamos a formato 8.837,24
-        s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-        if decimals == 0:
-            # Si pedimos 0 decimales, sacamos la parte decimal
-            s = s.split(',')[0]
-        return s
-    
+    # Formato latam de números (8.837,24); ver utils/formatting.py
+    app.add_template_filter(numfmt, "numfmt")
+    # Parciales cacheados por contenido (filas de dashboard/listados); ver utils/fragments.py
+    app.add_template_global(render_fragment, "render_fragment")
 
     app.config.from_object(AppConfig)
+    setup_logging(app)
+    init_metrics(app)
+    init_assets(app)
+
+    # Backend degradado: el breaker rechaza al instante y las vistas
+    # muestran un error claro (503 + Retry-After) en vez de colgarse
+    app.register_error_handler(UpstreamUnavailable, upstream_unavailable_response)
 
-    # Blueprints
-    from .blueprints.dashboard import bp as dashboard_bp
-    from .blueprints.cases import bp as cases_bp
-    from .blueprints.sla import bp as sla_bp
-    from .blueprints.config_bp import bp as config_bp
-    from .blueprints.chat import bp as chat_bp
-
-    app.register_blueprint(dashboard_bp, url_prefix="/")
-    app.register_blueprint(cases_bp, url_prefix="/cases")
-    app.register_blueprint(sla_bp, url_prefix="/sla")
-    app.register_blueprint(config_bp, url_prefix="/config")
-    app.register_blueprint(chat_bp, url_prefix="/chat")
+    # Blueprints: (módulo, url_prefix). Con WEB_LAZY_BLUEPRINTS se importan en
+    # el primer request en vez de acá, así create_app() no paga el import de
+    # las vistas; bench/startup.py reporta cuánto tarda cada uno
+    app.extensions["lazy_blueprints"] = {"loaded": False, "lock": threading.Lock()}
+    if app.config.get("WEB_LAZY_BLUEPRINTS", True):
+        app.wsgi_app = _LazyBlueprints(app, app.wsgi_app)
+    else:
+        load_blueprints(app)
 
     return app
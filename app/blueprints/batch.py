@@ -0,0 +1,127 @@
+# app/blueprints/batch.py
+import json
+import re
+from functools import partial
+from urllib.parse import quote, unquote
+
+from flask import Blueprint, request, jsonify, current_app
+
+from ..utils.api import get, fan_out
+from ..utils.auth import auth_header
+from ..utils.config_cache import config_cache
+from ..utils.logs import get_logger
+
+bp = Blueprint("batch", __name__)
+log = get_logger("batch")
+
+# Sub-requests permitidos (paths del backend, solo lectura). Los de config
+# pasan por la misma caché SWR que /config/api/*.
+_CONFIG_PATHS = (
+    re.compile(r"^/api/config/(sla|notification-window|flags|pricing|fx|settings)$"),
+)
+# /api/config/settings/<key>: la key se compara ya decodificada (acepta
+# %-encoding) y no puede ser un segmento de puntos ("." / "..").
+_SETTINGS_PATH = re.compile(r"^/api/config/settings/(?P<key>[^/]+)$")
+_SETTINGS_KEY = re.compile(r"^[\w-][\w.-]*$")
+# (path, query params que se reenvían): cualquier otro param se rechaza
+_BACKEND_PATHS = (
+    (re.compile(r"^/api/cases/\d+$"), frozenset()),
+    (re.compile(r"^/api/cases/sla-breaches$"), frozenset({"limit", "offset"})),
+    (re.compile(r"^/api/sla/breaches$"), frozenset({"limit", "offset"})),
+)
+
+
+def _allowed(path: str) -> tuple[str | None, str, frozenset]:
+    """
+    (kind, path, params): kind es 'config' | 'backend' si el path está en la
+    allowlist, None si no. El path devuelto es el que se reenvía (para
+    settings, con la key decodificada y re-encodeada); `params`, los query
+    params que acepta (los de config no llevan).
+    """
+    if any(p.match(path) for p in _CONFIG_PATHS):
+        return "config", path, frozenset()
+    m = _SETTINGS_PATH.match(path)
+    if m:
+        key = unquote(m.group("key"))
+        if not _SETTINGS_KEY.match(key):
+            return None, path, frozenset()
+        return "config", f"/api/config/settings/{quote(key, safe='')}", frozenset()
+    for pattern, params in _BACKEND_PATHS:
+        if pattern.match(path):
+            return "backend", path, params
+    return None, path, frozenset()
+
+
+def _decode(body: bytes, content_type: str):
+    if "json" in (content_type or ""):
+        try:
+            return json.loads(body or b"null")
+        except ValueError:
+            pass
+    return (body or b"").decode("utf-8", "replace")
+
+
+def _config_call(path: str, headers: dict) -> dict:
+    entry = config_cache().fetch(path, headers)
+    return {"status": entry.status, "body": _decode(entry.body, entry.content_type)}
+
+
+def _backend_call(path: str, params, headers: dict) -> dict:
+    r = get(path, params=params, headers=headers)
+    return {"status": r.status_code, "body": _decode(r.content, r.headers.get("Content-Type", ""))}
+
+
+@bp.post("/batch")
+def batch():
+    """
+    Varias lecturas al backend en un solo round trip (bootstrap de páginas):
+
+        POST /api/batch
+        { "requests": [ { "id": "pricing", "path": "/api/config/pricing" },
+                        { "id": "fx", "path": "/api/config/fx", "params": {...} }, ... ] }
+
+    Solo GET, solo paths de la allowlist y solo los query params que cada
+    uno admite; corren en paralelo con el JWT del caller. Devuelve { ok, results: { <id>: { status, body } | { status, error } } }.
+    `ok` es true si todos respondieron 2xx.
+    """
+    headers = auth_header(request.cookies.get("jwt"))
+    cfg = current_app.config
+    payload = request.get_json(silent=True) or {}
+    subs = payload.get("requests")
+    if not isinstance(subs, list) or not subs:
+        return jsonify({"ok": False, "error": "requests requerido"}), 400
+    if len(subs) > cfg.get("BATCH_MAX_REQUESTS", 10):
+        return jsonify({"ok": False, "error": f"máximo {cfg.get('BATCH_MAX_REQUESTS', 10)} requests por batch"}), 400
+
+    calls = {}
+    results = {}
+    for i, sub in enumerate(subs):
+        sub = sub if isinstance(sub, dict) else {}
+        rid = str(sub.get("id") or i)
+        path = str(sub.get("path") or "").split("?", 1)[0]
+        method = str(sub.get("method") or "GET").upper()
+        params = sub.get("params") or {}
+        kind, path, allowed_params = _allowed(path)
+        if rid in calls or rid in results:
+            results[rid] = {"status": 400, "error": "id duplicado"}
+        elif method != "GET" or kind is None:
+            results[rid] = {"status": 403, "error": f"no permitido: {method} {path}"}
+        elif not isinstance(params, dict) or not set(params) <= allowed_params:
+            extra = sorted(set(params) - allowed_params) if isinstance(params, dict) else params
+            results[rid] = {"status": 400, "error": f"params no permitidos para {path}: {extra}"}
+        elif kind == "config":
+            calls[rid] = partial(_config_call, path, headers)
+        else:
+            calls[rid] = partial(_backend_call, path, params or None, headers)
+
+    for rid, res in fan_out(calls, max_concurrency=cfg.get("BATCH_WORKERS", 6),
+                            timeout=cfg.get("BATCH_TIMEOUT", 30)).items():
+        if res.error is not None:
+            log.warning("batch %s falló: %s", rid, res.error)
+            status = 503 if getattr(res.error, "retry_after", None) else 502
+            results[rid] = {"status": status, "error": str(res.error)}
+        else:
+            results[rid] = res.value
+
+    ok = all(200 <= r["status"] < 300 for r in results.values())
+    return jsonify({"ok": ok, "results": results}), 200
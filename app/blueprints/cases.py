@@ -1,19 +1,191 @@
-from flask import Blueprint, render_template, request, jsonify, abort
-from ..utils.api import get, post, patch
+from flask import Blueprint, render_template, request, jsonify, abort, current_app
+from ..utils.api import get, post, fan_out
 from ..utils.auth import auth_header
+from ..utils.cache import TTLCache, SingleFlight, MISSING
+from ..utils.config_cache import config_cache, token_scope
+from ..utils.customer_index import PhoneIndexStore, normalize_phone
+from ..utils.fragments import render_fragment
+from ..utils.logs import get_logger, debug_payload, truncate
+from ..utils.metrics import register_collector
+from ..utils.paging import parse_page_request, fetch_page
+from ..utils.proxy import passthrough
 from urllib.parse import quote_plus
 from urllib.parse import urlencode
 from uuid import uuid4
+from concurrent.futures import Future
+from functools import partial
+import hashlib
+import json
+import threading
 
 bp = Blueprint("cases", __name__, template_folder="../templates")
+log = get_logger("cases")
+
+# Cotizaciones: caché corta + coalescing de pedidos idénticos en vuelo
+_QUOTE_CACHE: TTLCache | None = None
+_QUOTE_CACHE_LOCK = threading.Lock()
+_QUOTE_FLIGHTS = SingleFlight()
+
+
+def quote_cache() -> TTLCache:
+    """
+    Caché de cotizaciones del proceso; se crea la primera vez con la config de la app.
+    """
+    global _QUOTE_CACHE
+    if _QUOTE_CACHE is None:
+        with _QUOTE_CACHE_LOCK:
+            if _QUOTE_CACHE is None:
+                cfg = current_app.config
+                _QUOTE_CACHE = TTLCache(
+                    maxsize=cfg.get("QUOTE_CACHE_MAXSIZE", 2000),
+                    ttl=cfg.get("QUOTE_CACHE_TTL", 30),
+                    namespace="quote",
+                )
+    return _QUOTE_CACHE
+
+
+register_collector("quote", lambda: _QUOTE_CACHE.stats() if _QUOTE_CACHE else None)
+register_collector("quote_flights", _QUOTE_FLIGHTS.stats)
+
+# Índice local de clientes por teléfono (autocompletado sin ir al backend)
+_CUSTOMER_INDEX: PhoneIndexStore | None = None
+_CUSTOMER_INDEX_LOCK = threading.Lock()
+
+
+def customer_index() -> PhoneIndexStore:
+    """
+    Índices de clientes por scope; se crean la primera vez con la config de la app.
+    """
+    global _CUSTOMER_INDEX
+    if _CUSTOMER_INDEX is None:
+        with _CUSTOMER_INDEX_LOCK:
+            if _CUSTOMER_INDEX is None:
+                cfg = current_app.config
+                _CUSTOMER_INDEX = PhoneIndexStore(
+                    max_scopes=cfg.get("CUSTOMER_INDEX_SCOPES", 100),
+                    maxsize=cfg.get("CUSTOMER_INDEX_MAXSIZE", 50_000),
+                    ttl=cfg.get("CUSTOMER_INDEX_TTL", 3600),
+                )
+    return _CUSTOMER_INDEX
+
+
+register_collector("customer_index", lambda: _CUSTOMER_INDEX.stats() if _CUSTOMER_INDEX else None)
+
+
+def _index_customers(headers: dict, data) -> None:
+    # Lo que devuelva el backend ({customer} o {items}) alimenta el índice
+    if not isinstance(data, dict):
+        return
+    index = customer_index().get(token_scope(headers))
+    index.add(data.get("customer"))
+    if isinstance(data.get("items"), list):
+        index.add_many(data["items"])
+
+
+def _normalize_quote_value(v):
+    # 100.0 y 100 cotizan igual; dicts ordenados en el dump
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    if isinstance(v, dict):
+        return {k: _normalize_quote_value(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_normalize_quote_value(x) for x in v]
+    if isinstance(v, str):
+        return v.strip()
+    return v
+
+
+def _quote_key(path: str, body: dict, headers: dict) -> str:
+    """
+    Key de la cotización: body normalizado + versión de FX y pricing + scope del token.
+    Si cambia la config (o se invalida por una escritura), la key cambia.
+    """
+    cc = config_cache()
+    scope = token_scope(headers)
+    raw = json.dumps(_normalize_quote_value(body), sort_keys=True, separators=(",", ":"))
+    parts = (
+        path,
+        scope,
+        cc.version("/api/config/fx", scope),
+        cc.version("/api/config/pricing", scope),
+        raw,
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
 
 
 @bp.get("/")
 def list_cases():
+    """
+    Listado paginado de casos (server-side).
+    - ?page, ?page_size (acotado), ?sort, ?order, ?case_type, ?cursor
+    - ?format=rows devuelve solo las filas (HTML) + meta, para "Cargar más".
+    """
     token = request.cookies.get("jwt")
-    resp = get("/api/cases", headers=auth_header(token))
-    data = resp.json()
-    return render_template("cases/list.html", items=data.get("items", []))
+    cfg = current_app.config
+    req = parse_page_request(
+        request.args,
+        default_size=cfg.get("CASES_PAGE_SIZE", 50),
+        max_size=cfg.get("CASES_PAGE_MAX", 200),
+    )
+    page = fetch_page("/api/cases", auth_header(token), req)
+
+    if request.args.get("format") == "rows":
+        return jsonify({
+            "ok": True,
+            "html": render_fragment("cases/_rows.html", items=page.items),
+            **page.meta(),
+        })
+
+    return render_template("cases/list.html", items=page.items, page=page, req=req)
+
+# Parciales del detalle que se devuelven renderizados tras una mutación (?fragments=1)
+_DETAIL_FRAGMENTS = {
+    "state_badge": "cases/_state_badge.html",
+    "timeline": "cases/_timeline.html",
+    "attachments": "cases/_attachments.html",
+}
+
+
+def _wants_fragments() -> bool:
+    return request.args.get("fragments") == "1"
+
+
+def _with_fragments(case_id: int, data: dict, headers: dict) -> dict:
+    """
+    Agrega al resultado de una mutación el caso actualizado y los parciales
+    del detalle (badge de estado, timeline, adjuntos) ya renderizados, así
+    la página se actualiza en el lugar en vez de recargar todo.
+    Si el backend ya devolvió el caso completo no se vuelve a pedir.
+    """
+    case = data.get("case") if isinstance(data.get("case"), dict) else None
+    if case is None or "events" not in case or "attachments" not in case:
+        try:
+            r = get(f"/api/cases/{case_id}", headers=headers)
+            case = (r.json() or {}).get("case") if r.status_code == 200 else None
+        except Exception as e:
+            log.warning("refresh de caso %s falló: %s", case_id, e)
+            case = None
+    if not case:
+        return data  # sin fragments: el front cae en recargar la página
+    data["case"] = case
+    data["fragments"] = {name: render_template(tpl, c=case) for name, tpl in _DETAIL_FRAGMENTS.items()}
+    return data
+
+
+def _mutation_with_fragments(case_id: int, path: str, payload: dict, headers: dict):
+    """
+    POST al backend + caso actualizado y parciales si salió bien.
+    Mismo contrato de errores que passthrough(json_errors=True).
+    """
+    r = post(path, json=payload, headers=headers)
+    try:
+        data = r.json()
+    except ValueError:
+        return jsonify({"ok": False, "error": "backend no devolvió JSON", "status_code": r.status_code}), r.status_code
+    if r.ok and isinstance(data, dict) and data.get("ok") is not False:
+        data = _with_fragments(case_id, data, headers)
+    return jsonify(data), r.status_code
+
 
 @bp.get("/<int:case_id>")
 def case_detail(case_id: int):
@@ -56,35 +228,37 @@ def case_change_state(case_id: int):
         "comment": "..."
       }
     }
+    Con ?fragments=1 devuelve además el caso actualizado y los parciales
+    del detalle renderizados (ver _with_fragments).
     """
     token = request.cookies.get("jwt")
     headers = auth_header(token) if token else {}
 
     payload = request.get_json(force=True) or {}
 
-    r = post(f"/api/cases/{case_id}/state", json=payload, headers=headers)
+    if _wants_fragments():
+        return _mutation_with_fragments(case_id, f"/api/cases/{case_id}/state", payload, headers)
 
     # Devolvemos el JSON tal cual para que el JS del frontend decida qué hacer
-    try:
-        data = r.json()
-    except Exception:
-        data = {
-            "ok": False,
-            "error": "backend no devolvió JSON",
-            "status_code": r.status_code,
-        }
-
-    return jsonify(data), r.status_code
+    return passthrough("POST", f"/api/cases/{case_id}/state", json=payload,
+                       headers=headers, json_errors=True)
 
 @bp.post("/<int:case_id>/event")
 def add_event(case_id):
     token = request.cookies.get("jwt")
     payload = request.get_json(force=True)
-    r = post(f"/api/cases/{case_id}/events", json=payload, headers=auth_header(token))
-    return jsonify(r.json()), r.status_code
+    if _wants_fragments():
+        return _mutation_with_fragments(case_id, f"/api/cases/{case_id}/events", payload, auth_header(token))
+    return passthrough("POST", f"/api/cases/{case_id}/events", json=payload,
+                       headers=auth_header(token), json_errors=True)
 
 @bp.post("/quote")
 def quote():
+    """
+    Cotización con caché corta y coalescing de pedidos idénticos: el primer
+    pedido hace la llamada y los iguales que llegan mientras tanto esperan
+    su mismo future.
+    """
     token = request.cookies.get("jwt")
     body = request.get_json(force=True) or {}
 
@@ -92,17 +266,35 @@ def quote():
     path = "/api/quotes/goods" if kind == "GOODS" else "/api/quotes/remit"
 
     headers = auth_header(token) if token else {}
-    r = post(path, json=body, headers=headers)
+
+    # 1) Misma cotización hace poco (mismo body, FX y pricing): no vamos al backend
+    key = _quote_key(path, body, headers)
+    cache = quote_cache()
+    hit = cache.get(key)
+    if hit is not MISSING:
+        data, status = hit
+        return jsonify(data), status
+
+    # 2) Si ya hay una idéntica en vuelo, esperamos esa misma respuesta
+    future, leader = _QUOTE_FLIGHTS.do(key, Future)
+    if leader:
+        try:
+            future.set_result(post(path, json=body, headers=headers))
+        except Exception as e:
+            future.set_exception(e)
+    r = future.result()
 
     # Proxy robusto: intenta parsear JSON; si no, devuelve texto
     try:
         data = r.json()
+        # Solo cacheamos cotizaciones exitosas
+        if leader and r.status_code == 200 and not (isinstance(data, dict) and data.get("ok") is False):
+            cache.set(key, (data, r.status_code))
         # Si el upstream ya devuelve {"ok": true/false, ...} lo respetamos.
         return jsonify(data), r.status_code
     except ValueError:
         # No era JSON (por ej. HTML de error). Log + JSON de fallback.
-        print(f"[QUOTE PROXY] Error al parsear JSON desde {path}: status={r.status_code}")
-        print(f"[QUOTE PROXY] Body:\n{(r.text or '')[:1000]}")
+        log.warning("quote %s -> %s sin JSON: %s", path, r.status_code, truncate(r.text or ""))
         return (
             jsonify({
                 "ok": False,
@@ -187,18 +379,9 @@ def create_case():
     if fee_override is not None:
         backend_body["fee_override_json"] = fee_override
 
-    # ---- 5) Llamada al backend
+    # ---- 5) Llamada al backend; la respuesta se reenvía tal cual (JSON o no)
     headers = auth_header(token) if token else {}
-    r = post("/api/cases", json=backend_body, headers=headers)
-
-    # ---- 6) Respuesta robusta (evita 500 si el upstream no retorna JSON)
-    try:
-        data = r.json()
-        return jsonify(data), r.status_code
-    except ValueError:
-        return (r.text or "", r.status_code, {
-            "Content-Type": r.headers.get("Content-Type", "text/plain")
-        })
+    return passthrough("POST", "/api/cases", json=backend_body, headers=headers)
 
 
 @bp.patch("/<int:case_id>")
@@ -211,19 +394,8 @@ def update_case(case_id):
     payload = request.get_json(force=True) or {}
 
     headers = auth_header(token) if token else {}
-    # Reenviamos como PATCH al backend Railway
-    r = patch(f"/api/cases/{case_id}", json=payload, headers=headers)
-
-    try:
-        data = r.json()
-        return jsonify(data), r.status_code
-    except ValueError:
-        # Respuesta no-JSON (por ejemplo HTML de error)
-        return (
-            r.text or "",
-            r.status_code,
-            {"Content-Type": r.headers.get("Content-Type", "text/plain")}
-        )
+    # Reenviamos como PATCH al backend Railway (bytes tal cual, JSON o HTML de error)
+    return passthrough("PATCH", f"/api/cases/{case_id}", json=payload, headers=headers)
 
 @bp.get("/customer-lookup")
 def customer_lookup_proxy():
@@ -232,6 +404,13 @@ def customer_lookup_proxy():
     Front llama a:  /cases/customer-lookup?phone=+595981514767
     Esto redirige a: /api/customers/lookup?phone=+595981514767
     usando el mismo JWT.
+
+    Antes de ir al backend se consulta el índice local por teléfono:
+    - exacto (default): si el cliente está y no venció se responde
+      { ok, customer, source: "local" };
+    - ?prefix=1: { ok, items, source: "local" } con los que empiezan así
+      (desde CUSTOMER_INDEX_MIN_PREFIX dígitos);
+    - ?confirm=1 o miss: backend, y la respuesta refresca el índice.
     """
     token = request.cookies.get("jwt")
     raw_phone = (request.args.get("phone") or "").strip()
@@ -239,28 +418,43 @@ def customer_lookup_proxy():
     if not raw_phone:
         return jsonify({"ok": False, "error": "phone requerido"}), 400
 
+    headers = auth_header(token) if token else {}
+    cfg = current_app.config
+    if request.args.get("confirm") != "1":
+        index = customer_index().get(token_scope(headers))
+        if request.args.get("prefix") == "1":
+            if len(normalize_phone(raw_phone)) >= cfg.get("CUSTOMER_INDEX_MIN_PREFIX", 4):
+                items = index.prefix(raw_phone, limit=cfg.get("CUSTOMER_INDEX_PREFIX_LIMIT", 10))
+                if items:
+                    return jsonify({"ok": True, "items": items, "source": "local"}), 200
+        else:
+            customer = index.exact(raw_phone)
+            if customer is not None:
+                return jsonify({"ok": True, "customer": customer, "source": "local"}), 200
+
     # Construimos la querystring para el backend real
     qs = urlencode({"phone": raw_phone})
     path = f"/api/customers/lookup?{qs}"
 
-    headers = auth_header(token) if token else {}
     try:
         r = get(path, headers=headers)
     except Exception as e:
-        print("[customer_lookup_proxy] Error llamando backend:", e)
+        log.warning("customer lookup falló: %s", e)
         return jsonify({"ok": False, "error": "error backend proxy"}), 500
 
     try:
         data = r.json()
     except Exception:
         # Backend no devolvió JSON
-        print("[customer_lookup_proxy] Respuesta no JSON:", r.status_code, r.text[:500])
+        log.warning("customer lookup -> %s sin JSON: %s", r.status_code, truncate(r.text))
         return jsonify({
             "ok": False,
             "error": "backend no devolvió JSON",
             "status_code": r.status_code,
         }), r.status_code
 
+    if r.ok:
+        _index_customers(headers, data)
     return jsonify(data), r.status_code
 
 @bp.post("/customer-create")
@@ -268,33 +462,28 @@ def customer_create_proxy():
     """
     Crea un customer en el backend real.
     Body esperado: { "name": "...", "phone": "+595981..." , "email"?: "..." }
+    El cliente creado entra al índice local de teléfonos.
     """
     token = request.cookies.get("jwt")
     payload = request.get_json(force=True) or {}
 
     headers = auth_header(token) if token else {}
     r = post("/api/customers", json=payload, headers=headers)
-
     try:
         data = r.json()
-        return jsonify(data), r.status_code
-    except Exception:
-        return jsonify({
-            "ok": False,
-            "error": "backend no devolvió JSON",
-            "status_code": r.status_code,
-        }), r.status_code
-    
-
-@bp.post("/<int:case_id>/attachments/presign")
-def attachments_presign(case_id: int):
-    token = request.cookies.get("jwt")
-    headers = auth_header(token) if token else {}
+    except ValueError:
+        return jsonify({"ok": False, "error": "backend no devolvió JSON", "status_code": r.status_code}), r.status_code
 
-    payload = request.get_json(force=True) or {}
-    filename = payload.get("filename") or "file.bin"
-    content_type = payload.get("content_type", "application/octet-stream")
+    if r.ok:
+        _index_customers(headers, data)
+    return jsonify(data), r.status_code
+    
 
+def _presign_one(case_id: int, filename: str, content_type: str, headers: dict) -> tuple[dict, int]:
+    """
+    Pide al backend la URL de subida de un archivo.
+    Devuelve (json para el front, status).
+    """
     key = f"cases/{case_id}/{uuid4().hex}-{filename}"
 
     try:
@@ -304,37 +493,133 @@ def attachments_presign(case_id: int):
             headers=headers,
         )
     except Exception as e:
-        print("[proxy presign] error llamando backend:", repr(e))
-        return jsonify({
+        log.warning("presign case %s falló: %r", case_id, e)
+        return {
             "ok": False,
             "error": "No se pudo contactar al backend real en /attachments/presign",
-        }), 500
+        }, 500
 
-    # Logueamos SIEMPRE la respuesta del backend real
-    print("[proxy presign] backend status:", r.status_code)
-    print("[proxy presign] backend body:", r.text)
+    log.debug("presign case %s -> %s", case_id, r.status_code)
+    debug_payload(log, "presign body", r.text)
 
     try:
         data = r.json()
     except Exception:
-        return jsonify({
+        return {
             "ok": False,
             "error": "backend no devolvió JSON en presign",
             "status_code": r.status_code,
-        }), r.status_code
+        }, r.status_code
 
     if not r.ok or not data.get("upload_url"):
-        return jsonify({
+        return {
             "ok": False,
             "error": data.get("error") or "backend presign sin upload_url",
             "status_code": r.status_code,
-        }), r.status_code
+        }, r.status_code
 
-    return jsonify({
+    return {
         "ok": True,
         "upload_url": data["upload_url"],
         "final_key": key,
-    }), 200
+    }, 200
+
+
+def _commit_one(case_id: int, item: dict, headers: dict) -> tuple[dict, int]:
+    """
+    Registra un adjunto ya subido. Devuelve (json del backend, status).
+    """
+    r = post(
+        f"/api/cases/{case_id}/attachments/commit",
+        json={"key": item.get("key"), "kind": item.get("kind", "COMPROBANTE"), "meta": item.get("meta")},
+        headers=headers,
+    )
+
+    try:
+        data = r.json()
+    except Exception:
+        return {
+            "ok": False,
+            "error": "backend no devolvió JSON en commit",
+            "status_code": r.status_code,
+        }, r.status_code
+
+    return data, r.status_code
+
+
+def _batch_items(payload: dict, field: str):
+    """
+    (items, None) si el batch es válido; (None, respuesta 400) si falta o
+    supera ATTACHMENTS_BATCH_MAX (no se recorta: el front parte en lotes).
+    """
+    items = payload.get(field)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"ok": False, "error": f"{field} requerido"}), 400)
+    limit = current_app.config.get("ATTACHMENTS_BATCH_MAX", 20)
+    if len(items) > limit:
+        return None, (jsonify({"ok": False, "error": f"máximo {limit} archivos por llamada", "max": limit}), 400)
+    return items, None
+
+
+def _run_batch(calls: dict) -> list[dict]:
+    """
+    Corre las llamadas por archivo en paralelo (concurrencia acotada) y
+    devuelve un resultado por ítem, en el mismo orden.
+    """
+    results = fan_out(calls, max_concurrency=current_app.config.get("ATTACHMENTS_BATCH_WORKERS", 6))
+    items = []
+    for idx, res in results.items():
+        if res.error is not None:
+            log.warning("adjunto #%s falló: %r", idx, res.error)
+            items.append({"ok": False, "error": "No se pudo contactar al backend real"})
+            continue
+        data, status = res.value
+        if not isinstance(data, dict):
+            data = {"ok": 200 <= status < 300, "data": data}
+        data.setdefault("ok", 200 <= status < 300)
+        data["status_code"] = status
+        items.append(data)
+    return items
+
+
+@bp.post("/<int:case_id>/attachments/presign")
+def attachments_presign(case_id: int):
+    token = request.cookies.get("jwt")
+    headers = auth_header(token) if token else {}
+
+    payload = request.get_json(force=True) or {}
+    filename = payload.get("filename") or "file.bin"
+    content_type = payload.get("content_type", "application/octet-stream")
+
+    body, status = _presign_one(case_id, filename, content_type, headers)
+    return jsonify(body), status
+
+@bp.post("/<int:case_id>/attachments/presign-batch")
+def attachments_presign_batch(case_id: int):
+    """
+    Presign de varios archivos en una sola llamada (presigns al backend en paralelo).
+    Front manda:
+      { "files": [{ "filename": "...", "content_type": "..." }, ...] }
+    Devuelve { ok, items: [{ ok, upload_url, final_key, filename } | { ok: false, error }] }
+    en el mismo orden.
+    """
+    token = request.cookies.get("jwt")
+    headers = auth_header(token) if token else {}
+
+    files, error = _batch_items(request.get_json(force=True) or {}, "files")
+    if error is not None:
+        return error
+
+    calls = {}
+    for idx, f in enumerate(files):
+        f = f if isinstance(f, dict) else {}
+        calls[idx] = partial(_presign_one, case_id, f.get("filename") or "file.bin",
+                             f.get("content_type") or "application/octet-stream", headers)
+    items = _run_batch(calls)
+    for f, item in zip(files, items):
+        item["filename"] = f.get("filename") if isinstance(f, dict) else None
+
+    return jsonify({"ok": all(i["ok"] for i in items), "items": items}), 200
 
 @bp.post("/<int:case_id>/attachments/commit")
 def attachments_commit(case_id: int):
@@ -342,32 +627,51 @@ def attachments_commit(case_id: int):
     Proxy web -> backend real para registrar el adjunto.
     Front manda:
       { "key": "<final_key>", "kind"?: "COMPROBANTE", "meta"?: {...} }
+    Con ?fragments=1 agrega `case` y `fragments` (refresh parcial del detalle).
     """
 
     token = request.cookies.get("jwt")
     headers = auth_header(token) if token else {}
 
     payload = request.get_json(force=True) or {}
-    key = payload.get("key")
-    if not key:
+    if not payload.get("key"):
         return jsonify({"ok": False, "error": "key requerido"}), 400
 
-    kind = payload.get("kind", "COMPROBANTE")
-    meta = payload.get("meta")
-
-    r = post(
-        f"/api/cases/{case_id}/attachments/commit",
-        json={"key": key, "kind": kind, "meta": meta},
-        headers=headers,
-    )
+    data, status = _commit_one(case_id, payload, headers)
+    if (_wants_fragments() and 200 <= status < 300
+            and isinstance(data, dict) and data.get("ok") is not False):
+        data = _with_fragments(case_id, data, headers)
+    return jsonify(data), status
 
-    try:
-        data = r.json()
-    except Exception:
-        return jsonify({
-            "ok": False,
-            "error": "backend no devolvió JSON en commit",
-            "status_code": r.status_code,
-        }), r.status_code
+@bp.post("/<int:case_id>/attachments/commit-batch")
+def attachments_commit_batch(case_id: int):
+    """
+    Registra varios adjuntos ya subidos en una sola llamada.
+    Front manda:
+      { "items": [{ "key": "<final_key>", "kind"?: "COMPROBANTE", "meta"?: {...} }, ...] }
+    Devuelve { ok, items: [...] } con el resultado del backend por ítem, en el mismo orden.
+    Con ?fragments=1 y al menos un commit OK agrega `case` y `fragments`.
+    """
+    token = request.cookies.get("jwt")
+    headers = auth_header(token) if token else {}
 
-    return jsonify(data), r.status_code
\ No newline at end of file
+    items, error = _batch_items(request.get_json(force=True) or {}, "items")
+    if error is not None:
+        return error
+
+    calls = {}
+    results = [None] * len(items)
+    for idx, it in enumerate(items):
+        if not isinstance(it, dict) or not it.get("key"):
+            results[idx] = {"ok": False, "error": "key requerido"}
+            continue
+        calls[idx] = partial(_commit_one, case_id, it, headers)
+
+    for idx, res in zip(calls, _run_batch(calls)):
+        res["key"] = items[idx]["key"]
+        results[idx] = res
+
+    out = {"ok": all(r["ok"] for r in results), "items": results}
+    if _wants_fragments() and any(r["ok"] for r in results):
+        out = _with_fragments(case_id, out, headers)
+    return jsonify(out), 200
@@ -1,10 +1,22 @@
 # app/blueprints/chat.py
-from flask import Blueprint, render_template, request, jsonify
-from ..utils.api import post
+import json
+import queue
+import threading
+import time
+
+from flask import Blueprint, render_template, request, jsonify, Response, current_app, stream_with_context
+from ..utils.api import _request, post, in_app_context
 from ..utils.auth import auth_header
+from ..utils.resilience import UpstreamUnavailable
 
 bp = Blueprint("chat", __name__, template_folder="../templates")
 
+# ¿El backend ofrece el endpoint de streaming? None = todavía no sabemos.
+# Si responde que no, se usa el fallback y se vuelve a probar cada _STREAM_REPROBE_SECONDS.
+_STREAM_SUPPORTED: bool | None = None
+_STREAM_CHECKED_AT = 0.0
+_STREAM_REPROBE_SECONDS = 600
+
 
 @bp.get("/")
 def chat_home():
@@ -16,23 +28,12 @@ def chat_home():
     return render_template("chat/index.html", username=username)
 
 
-@bp.post("/api/send")
-def chat_send():
-    """
-    Proxy web → backend real (/api/assistant/chat) para hablar con Viki.
-    """
-    token = request.cookies.get("jwt")
-    payload = request.get_json(force=True) or {}
-
-    text = (payload.get("text") or "").strip()
-    if not text:
-        return jsonify({"ok": False, "error": "Texto vacío"}), 400
-
+def _assistant_body(payload: dict, text: str) -> dict:
     username = payload.get("username") or "Usuario Web"
     external_id = payload.get("external_id") or f"WEB-{username}"
 
     # 🔹 Este body es el que espera el backend en /api/assistant/chat
-    body = {
+    return {
         "text": text,
         "username": username,
         "external_id": external_id,
@@ -43,41 +44,231 @@ def chat_send():
         "channel": payload.get("channel") or "WEB_CHAT",
     }
 
-    headers = auth_header(token) if token else {}
-
-    # 🔹 Llamamos al nuevo endpoint del backend
-    r = post("/api/assistant/chat", json=body, headers=headers)
 
-    raw_text = r.text
-
-    # Intentamos parsear JSON del backend
-    try:
-        data = r.json()
-    except Exception:
+def _reply_payload(status_code: int, raw_text: str, data) -> tuple[dict, int]:
+    """
+    Normaliza la respuesta de /api/assistant/chat al JSON que espera el front.
+    `data` es el JSON parseado o None si el backend no devolvió JSON.
+    """
+    if data is None:
         # El backend devolvió HTML o texto plano
-        return jsonify({
+        return {
             "ok": False,
-            "error": f"Backend devolvió {r.status_code} sin JSON",
-            "backend_status": r.status_code,
+            "error": f"Backend devolvió {status_code} sin JSON",
+            "backend_status": status_code,
             "backend_text": raw_text[:500],
-        }), r.status_code
+        }, status_code
 
     # A partir de acá, SIEMPRE devolvemos 200 al front
     # y dejamos el detalle del error en el JSON.
     if not data.get("ok"):
-        return jsonify({
+        return {
             "ok": False,
             "error": data.get("error") or "Error en backend assistant/chat",
-            "backend_status": r.status_code,
+            "backend_status": status_code,
             "backend_raw": data,
-        }), 200  # 👈 importante: ya no 400
+        }, 200  # 👈 importante: ya no 400
 
-    return jsonify({
+    return {
         "ok": True,
         "reply_text": data.get("reply_text"),
         "reply_voice": data.get("reply_voice"),
         "audio_filename": data.get("audio_filename"),
         "media_url": data.get("media_url"),
-        "backend_status": r.status_code,
+        "backend_status": status_code,
         "backend_raw": data.get("raw"),  # por si querés debugear
-    }), 200
+    }, 200
+
+
+@bp.post("/api/send")
+def chat_send():
+    """
+    Proxy web → backend real (/api/assistant/chat) para hablar con Viki.
+    Usa el pool keep-alive compartido; el thread del worker espera la
+    respuesta del LLM (hasta 60 s), así que la concurrencia la acotan
+    WEB_WORKERS * WEB_THREADS (ver README, "Producción").
+    """
+    token = request.cookies.get("jwt")
+    payload = request.get_json(force=True) or {}
+
+    text = (payload.get("text") or "").strip()
+    if not text:
+        return jsonify({"ok": False, "error": "Texto vacío"}), 400
+
+    body = _assistant_body(payload, text)
+    headers = auth_header(token) if token else {}
+
+    # 🔹 Llamamos al nuevo endpoint del backend
+    r = post("/api/assistant/chat", json=body, headers=headers)
+
+    # Intentamos parsear JSON del backend
+    try:
+        data = r.json()
+    except Exception:
+        data = None
+
+    out, status = _reply_payload(r.status_code, r.text, data)
+    return jsonify(out), status
+
+
+# ===============================
+# Streaming (SSE)
+# ===============================
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _chunk_text(raw: str) -> str:
+    """
+    Texto incremental de un evento del upstream: acepta JSON
+    ({"delta"|"text"|"reply_text": ...}) o texto plano.
+    """
+    try:
+        d = json.loads(raw)
+    except ValueError:
+        return raw
+    if isinstance(d, dict):
+        return d.get("delta") or d.get("text") or d.get("reply_text") or ""
+    return d if isinstance(d, str) else ""
+
+
+def _sse_event(event: str, raw: str):
+    """(event, data) para el cliente a partir de un evento SSE completo del upstream."""
+    if event in ("done", "end"):
+        # Evento final: lo normalizamos igual que /api/send
+        try:
+            final = json.loads(raw)
+        except ValueError:
+            final = None
+        if isinstance(final, dict):
+            final.setdefault("ok", True)
+            return "reply", _reply_payload(200, raw, final)[0]
+        return None
+    return "chunk", {"text": _chunk_text(raw)}
+
+
+def _produce(out: queue.Queue, cancel: threading.Event, stream_path: str, body: dict, headers: dict):
+    """
+    Corre en un thread aparte (con app context): trae la respuesta del
+    asistente y la deja en `out` como eventos (event, data). Termina siempre
+    con "done". Pasa por _request/post, así que aplica el breaker, el timeout
+    adaptativo y las métricas de upstream como cualquier otra llamada.
+    Si `cancel` se activa (el cliente se fue) corta el stream del upstream.
+    """
+    global _STREAM_SUPPORTED, _STREAM_CHECKED_AT
+
+    try:
+        # 1) Streaming real si el backend lo ofrece
+        try_stream = not (_STREAM_SUPPORTED is False
+                          and time.monotonic() - _STREAM_CHECKED_AT < _STREAM_REPROBE_SECONDS)
+        if try_stream:
+            h = {**headers, "Accept": "text/event-stream"}
+            with _request("POST", stream_path, json=body, headers=h, stream=True) as r:
+                ctype = r.headers.get("Content-Type", "")
+                if r.status_code == 200 and "text/event-stream" in ctype:
+                    _STREAM_SUPPORTED = True
+                    event, data_lines = "message", []
+                    for line in r.iter_lines(decode_unicode=True):
+                        if cancel.is_set():
+                            return
+                        if line.startswith(":"):
+                            continue
+                        if line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data_lines.append(line[5:].lstrip())
+                        elif line == "" and data_lines:
+                            ev = _sse_event(event, "\n".join(data_lines))
+                            if ev is not None:
+                                out.put(ev)
+                            event, data_lines = "message", []
+                    # El upstream puede cerrar sin la línea en blanco final
+                    if data_lines:
+                        ev = _sse_event(event, "\n".join(data_lines))
+                        if ev is not None:
+                            out.put(ev)
+                    return
+                if r.status_code not in (404, 405, 501):
+                    # Respondió sin streaming: esa ya es la respuesta (no repetimos
+                    # la llamada para no invocar dos veces al asistente)
+                    try:
+                        data = r.json()
+                    except ValueError:
+                        data = None
+                    reply, _status = _reply_payload(r.status_code, r.text, data)
+                    out.put(("reply", reply))
+                    return
+                _STREAM_SUPPORTED = False
+                _STREAM_CHECKED_AT = time.monotonic()
+
+        # 2) Fallback: respuesta completa (el generador manda keep-alives mientras tanto)
+        r = post("/api/assistant/chat", json=body, headers=headers)
+        try:
+            data = r.json()
+        except ValueError:
+            data = None
+        reply, _status = _reply_payload(r.status_code, r.text, data)
+        out.put(("reply", reply))
+    except UpstreamUnavailable as e:
+        out.put(("error", {"ok": False, "error": str(e), "retry_after": e.retry_after}))
+    except Exception as e:
+        out.put(("error", {"ok": False, "error": f"Error de conexión con el asistente: {e}"}))
+    finally:
+        out.put(("done", {}))
+
+
+@bp.post("/api/stream")
+def chat_stream():
+    """
+    Igual que /api/send pero responde por Server-Sent Events:
+    - event: chunk    {"text": "..."}  texto incremental (si el backend hace streaming)
+    - event: reply    mismo JSON que /api/send (respuesta final)
+    - event: progress {"elapsed": s}   mientras se espera sin datos
+    - event: error / event: done
+    Además manda comentarios keep-alive para que los proxies no corten la conexión.
+    La llamada al backend corre en un thread propio mientras el de la request
+    escribe los eventos: cada stream abierto ocupa dos threads.
+    """
+    token = request.cookies.get("jwt")
+    payload = request.get_json(force=True) or {}
+
+    text = (payload.get("text") or "").strip()
+    if not text:
+        return jsonify({"ok": False, "error": "Texto vacío"}), 400
+
+    body = _assistant_body(payload, text)
+    headers = auth_header(token) if token else {}
+    cfg = current_app.config
+    keepalive = cfg.get("CHAT_SSE_KEEPALIVE", 10)
+
+    events: queue.Queue = queue.Queue()
+    cancel = threading.Event()
+    threading.Thread(
+        target=in_app_context(_produce),
+        args=(events, cancel, cfg.get("ASSISTANT_STREAM_PATH", "/api/assistant/chat/stream"), body, headers),
+        name="chat-stream", daemon=True,
+    ).start()
+
+    def generate():
+        started = time.monotonic()
+        yield "retry: 5000\n\n"
+        try:
+            while True:
+                try:
+                    event, data = events.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    yield _sse("progress", {"elapsed": round(time.monotonic() - started, 1)})
+                    continue
+                yield _sse(event, data)
+                if event == "done":
+                    return
+        finally:
+            # Si el cliente se fue, no seguimos leyendo el stream del backend
+            cancel.set()
+
+    return Response(stream_with_context(generate()), headers={
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx: no bufferizar
+    })
@@ -1,33 +1,37 @@
-from flask import Blueprint, render_template, request
-from collections import defaultdict, OrderedDict
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
+from flask import Blueprint, render_template, request, current_app, jsonify
+from collections import OrderedDict
+import threading
+import time
+from functools import partial
 
-from ..utils.api import get
+from ..utils.api import get, fan_out
 from ..utils.auth import auth_header
+from ..utils.cache import TTLCache, MISSING, NEGATIVE, shared_store
+from ..utils.aggregates import SnapshotStore
+from ..utils.config_cache import token_scope
+from ..utils.formatting import format_column
+from ..utils.fragments import render_fragment
+from ..utils.logs import get_logger, debug_payload, truncate
+from ..utils.metrics import register_collector
+from ..utils.paging import PageRequest, window, sort_key
+from ..utils.sla_feed import sla_feed
 
 bp = Blueprint("dashboard", __name__, template_folder="../templates")
+log = get_logger("dashboard")
 
-# Caché simple en memoria para nombres de clientes
-_CUSTOMER_CACHE: dict[int, str] = {}
+# Caché de nombres de clientes (LRU + TTL, opcionalmente compartida vía SQLite)
+_CUSTOMER_CACHE: TTLCache | None = None
+_CUSTOMER_CACHE_LOCK = threading.Lock()
 
-def _format_timestamp_local(src_iso: str) -> tuple[str, str]:
-    """
-    Devuelve (iso_original, display_legible).
-    - Si viene con 'Z' u offset, lo parsea y convierte a zona local del sistema.
-    - Si viene sin tz, asume UTC y convierte a local.
-    - Si falla, deja el ISO como display.
-    """
-    disp = src_iso
-    try:
-        dt = datetime.fromisoformat((src_iso or "").replace("Z", "+00:00"))
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        dt_local = dt.astimezone()  # zona local del sistema, sin ZoneInfo
-        disp = dt_local.strftime("%d/%m/%Y")
-    except Exception:
-        pass
-    return src_iso, disp
+# Snapshots incrementales de casos por scope (token)
+_SNAPSHOTS: SnapshotStore | None = None
+_SNAPSHOTS_LOCK = threading.Lock()
+
+# ¿El backend soporta /api/customers?ids=...? None = todavía no sabemos.
+# Si responde que no, se vuelve a probar cada _BULK_REPROBE_SECONDS.
+_BULK_SUPPORTED: bool | None = None
+_BULK_CHECKED_AT = 0.0
+_BULK_REPROBE_SECONDS = 600
 
 def _first_non_empty(*vals):
     for v in vals:
@@ -35,121 +39,304 @@ def _first_non_empty(*vals):
             return v
     return None
 
-def _fetch_customer_name(cid: int, headers: dict) -> str:
-    if cid in _CUSTOMER_CACHE:
-        return _CUSTOMER_CACHE[cid]
+def _customer_name_from(cid: int, data) -> str:
+    # puede venir plano {"id":..,"name":..} o envuelto {"customer":{...}}
+    data = data or {}
+    cust = data.get("customer", data) if isinstance(data, dict) else {}
+    return _first_non_empty((cust or {}).get("name"), f"Cliente #{cid}")
+
+def case_snapshots() -> SnapshotStore:
+    """
+    Store de snapshots del proceso; se crea la primera vez con la config de la app.
+    """
+    global _SNAPSHOTS
+    if _SNAPSHOTS is None:
+        with _SNAPSHOTS_LOCK:
+            if _SNAPSHOTS is None:
+                cfg = current_app.config
+                _SNAPSHOTS = SnapshotStore(
+                    max_scopes=cfg.get("DASHBOARD_SNAPSHOT_SCOPES", 100),
+                    delta_param=cfg.get("CASES_DELTA_PARAM", "updated_since"),
+                )
+    return _SNAPSHOTS
+
+def customer_cache() -> TTLCache:
+    """
+    Caché de nombres del proceso; se crea la primera vez con la config de la app.
+    """
+    global _CUSTOMER_CACHE
+    if _CUSTOMER_CACHE is None:
+        with _CUSTOMER_CACHE_LOCK:
+            if _CUSTOMER_CACHE is None:
+                cfg = current_app.config
+                _CUSTOMER_CACHE = TTLCache(
+                    maxsize=cfg.get("CUSTOMER_CACHE_MAXSIZE", 5000),
+                    ttl=cfg.get("CUSTOMER_CACHE_TTL", 900),
+                    negative_ttl=cfg.get("CUSTOMER_CACHE_NEGATIVE_TTL", 60),
+                    store=shared_store(cfg.get("CACHE_DB_PATH")),
+                    namespace="customer_name",
+                )
+    return _CUSTOMER_CACHE
+
+register_collector("customer_name", lambda: _CUSTOMER_CACHE.stats() if _CUSTOMER_CACHE else None)
+
+def _load_customer_name(cid: int, headers: dict) -> str | None:
+    """
+    Trae el nombre de un cliente del backend (sin caché).
+    Devuelve None si el lookup falla.
+    """
     try:
         r = get(f"/api/customers/{cid}", headers=headers)
-        print(f"[CUSTOMER FETCH] {cid} -> {r.status_code} {r.text}")  # 👈 agrega esto
+        log.debug("customer fetch %s -> %s", cid, r.status_code)
+        debug_payload(log, f"customer {cid} body", r.text)
         if getattr(r, "ok", False):
-            data = r.json() or {}
-            name = _first_non_empty(data.get("name"), f"Cliente #{cid}")
-        else:
-            name = f"Cliente #{cid}"
+            return _customer_name_from(cid, r.json())
     except Exception as e:
-        print(f"[CUSTOMER ERROR] {cid} -> {e}")
-        name = f"Cliente #{cid}"
-    _CUSTOMER_CACHE[cid] = name
-    return name
+        log.warning("customer fetch %s falló: %s", cid, e)
+    return None
+
+def _fetch_customers_bulk(ids: list[int], headers: dict) -> dict[int, str] | None:
+    """
+    Intenta resolver todos los nombres en un solo round trip con
+    GET /api/customers?ids=1,2,3.
+    Devuelve None si el backend no ofrece el lookup masivo.
+    """
+    global _BULK_SUPPORTED, _BULK_CHECKED_AT
+
+    if _BULK_SUPPORTED is False and time.monotonic() - _BULK_CHECKED_AT < _BULK_REPROBE_SECONDS:
+        return None
+
+    try:
+        r = get("/api/customers", params={"ids": ",".join(str(i) for i in ids)}, headers=headers)
+        data = r.json() if getattr(r, "ok", False) else None
+    except Exception as e:
+        log.warning("customer bulk lookup falló: %s", e)
+        return None  # error transitorio: no marcamos como no soportado
+
+    items = data.get("items") if isinstance(data, dict) else data
+    # Si el backend ignora ?ids= y devuelve otra cosa, lo tomamos como "no soportado"
+    if not isinstance(items, list) or (items and not any(
+            isinstance(it, dict) and it.get("id") in ids for it in items)):
+        _BULK_SUPPORTED = False
+        _BULK_CHECKED_AT = time.monotonic()
+        return None
+
+    if not items:
+        return {}  # sin información: los faltantes se piden uno a uno
+
+    _BULK_SUPPORTED = True
+    wanted = set(ids)
+    return {
+        it["id"]: _customer_name_from(it["id"], it)
+        for it in items
+        if isinstance(it, dict) and it.get("id") in wanted
+    }
+
+def _cached_customer_names(customer_ids, headers: dict) -> dict[int, str]:
+    """
+    Nombres de clientes pasando por la caché:
+    - hits se usan directo,
+    - negativos (lookup fallido reciente) usan el nombre genérico sin volver a pedir,
+    - el resto se resuelve contra el backend y se guarda.
+    Las claves llevan el scope del token (como las cachés de config y quote):
+    lo que resolvió un tenant no se sirve a otro, tampoco vía el store SQLite.
+    """
+    cache = customer_cache()
+    scope = token_scope(headers)
+    names: dict[int, str] = {}
+    missing = []
+    for cid in customer_ids:
+        hit = cache.get((scope, cid))
+        if hit is MISSING:
+            missing.append(cid)
+        elif hit is NEGATIVE:
+            names[cid] = f"Cliente #{cid}"
+        else:
+            names[cid] = hit
+
+    for cid, name in _resolve_customer_names(missing, headers).items():
+        if name is None:
+            cache.set_negative((scope, cid))
+            names[cid] = f"Cliente #{cid}"
+        else:
+            cache.set((scope, cid), name)
+            names[cid] = name
+    return names
+
+def _resolve_customer_names(customer_ids, headers: dict) -> dict[int, str | None]:
+    """
+    Resuelve los nombres de varios clientes (None = lookup fallido):
+    1) lookup masivo si el backend lo soporta (1 round trip),
+    2) si no, fetch individuales en paralelo con concurrencia acotada.
+    """
+    ids = sorted(customer_ids)
+    if not ids:
+        return {}
+
+    cfg = current_app.config
+    names: dict[int, str] = {}
+
+    if cfg.get("CUSTOMER_BULK_LOOKUP", True):
+        names = _fetch_customers_bulk(ids, headers) or {}
+
+    missing = [cid for cid in ids if cid not in names]
+    if not missing:
+        return names
+
+    # fan_out propaga el app context a los threads y aísla errores por cliente
+    results = fan_out(
+        {cid: partial(_load_customer_name, cid, headers) for cid in missing},
+        max_concurrency=cfg.get("CUSTOMER_LOOKUP_WORKERS", 8),
+    )
+    for cid, res in results.items():
+        if res.error is not None:
+            log.warning("customer fetch %s falló: %s", cid, res.error)
+        names[cid] = res.value if res.error is None else None
+    return names
+
+
+def _normalize_case(c: dict, customer_map: dict) -> dict:
+    """
+    Fila normalizada de un caso para el dashboard. `updated_at_display` ya
+    viene puesto por _format_case_dates (toda la columna de una vez).
+    """
+    case_type = _first_non_empty(c.get("case_type"), c.get("type"), "Otros")
+    state = _first_non_empty(c.get("state"), "—")
+    title = _first_non_empty(c.get("title"), c.get("code"), f"Caso #{c.get('id')}")
+    cid = c.get("customer_id")
+    customer_nombre = (
+        customer_map.get(cid)
+        or ((c.get("customer") or {}).get("name") if isinstance(c.get("customer"), dict) else None)
+        or c.get("customer_nombre")
+        or (f"Cliente #{cid}" if cid else "—")
+    )
+
+    #Display de hora y zona horaria
+    iso_val = _first_non_empty(c.get("updated_at"), c.get("created_at"), "")
+    disp_val = c.get("updated_at_display", iso_val)
+
+    return {
+        "id": c.get("id"),
+        "code": c.get("code"),
+        "case_type": case_type,
+        "state": state,
+        "state_lower": (state or "").lower(),
+        "title": title,
+        "updated_at": iso_val,
+        "updated_at_display": disp_val,
+        "customer_nombre": customer_nombre,
+    }
+
+
+def _format_case_dates(cases: list) -> list:
+    """
+    Fecha legible (zona TZ, dd/mm/aaaa) de updated_at, o created_at si no
+    hay, para todos los casos recibidos de una vez; cada timestamp distinto
+    se convierte una sola vez. Si no se puede parsear queda el ISO.
+    """
+    return format_column(cases, ("updated_at", "created_at"), "updated_at_display", "%d/%m/%Y")
 
 
 @bp.get("/")
 def index():
+    """
+    Dashboard de casos.
+    Los KPI y agrupaciones salen de un snapshot incremental por token: cada
+    vista solo pide al backend los casos cambiados desde la última sync
+    (?updated_since=<watermark>) y aplica las diferencias. Resync completo
+    cada DASHBOARD_FULL_RESYNC segundos o con ?resync=1.
+    """
     token = request.cookies.get("jwt")
     headers = auth_header(token)
+    cfg = current_app.config
 
-    def debug_get(path: str, headers: dict):
-        r = get(path, headers=headers)
+    def debug_result(path: str, res):
+        log.debug("GET %s -> %s (%.0f ms)", path, res.status_code, res.elapsed * 1000)
 
-        # Logueamos SIEMPRE el status
-        print(f"[DEBUG] GET {path} -> {getattr(r, 'status_code', None)}")
+        if res.error is not None:
+            log.warning("GET %s falló: %s", path, res.error)
+        elif res.data is None:
+            log.warning("GET %s -> %s sin JSON: %s", path, res.status_code,
+                        truncate(getattr(res.response, "text", "")))
+        else:
+            # El JSON completo solo con LOG_PAYLOADS (puede pesar megas)
+            debug_payload(log, f"GET {path} JSON", res.data)
 
-        try:
-            data = r.json()
-            print(f"[DEBUG] JSON: {data}")
-        except Exception as e:
-            print(f"[DEBUG] No se pudo parsear JSON: {e}")
-            print(f"[DEBUG] Texto crudo: {getattr(r, 'text', None)}")
-            data = None
+        return res.data if res.ok and isinstance(res.data, dict) else {}
 
-        return r, data
+    snap = case_snapshots().get(token_scope(headers))
+    plan = snap.plan(
+        min_interval=cfg.get("DASHBOARD_MIN_SYNC", 5),
+        full_interval=cfg.get("DASHBOARD_FULL_RESYNC", 120),
+        force=request.args.get("resync") == "1",
+    )
+    rows_only = request.args.get("format") == "rows"
 
+    # 1) Casos (delta o completo) y 2) SLA: independientes, en paralelo. Los SLA
+    #    (/api/sla/breaches) salen del snapshot compartido (utils/sla_feed.py);
+    #    solo el primero del scope va al backend
+    calls = {}
+    if plan is not None:
+        calls["/api/cases"] = partial(get, "/api/cases", params=plan.params or None, headers=headers)
+    if not rows_only:
+        calls["sla"] = partial(sla_feed("dashboard").snapshot, headers)
+    results = fan_out(calls)
 
-    # 1) Casos
-    r_cases, data_cases = debug_get("/api/cases", headers=headers)
-    cases_raw = (data_cases or {}).get("items", []) if getattr(r_cases, "ok", False) else []
-    print(f"Cases Raw: {cases_raw}")
+    sla_breaches = None
+    if "sla" in results:
+        if results["sla"].error is not None:
+            log.warning("SLA vencidos no disponibles: %s", results["sla"].error)
+        else:
+            sla_breaches = results["sla"].value
 
-    # 2) SLA
-    r_sla, data_sla = debug_get("/api/sla/breaches", headers=headers)
-    sla_breaches = (data_sla or {}).get("items", []) if getattr(r_sla, "ok", False) else []
-    print(f"SLA Breaches: {sla_breaches}")
+    if plan is not None:
+        res_cases = results["/api/cases"]
+        cases_raw = debug_result("/api/cases", res_cases).get("items", [])
+        log.debug("casos %s: %d", "full" if plan.full else "delta", len(cases_raw))
 
+        # Si falla un delta nos quedamos con el snapshot anterior
+        if res_cases.ok:
+            # 3) Resolver nombres solo de los clientes de los casos recibidos
+            customer_ids = {c.get("customer_id") for c in cases_raw if c.get("customer_id")}
+            customer_map = _cached_customer_names(customer_ids, headers)
 
-    # 3) Resolver nombres de clientes (SECUENCIAL, sin threads)
-    customer_ids = {c.get("customer_id") for c in cases_raw if c.get("customer_id")}
-    customer_map: dict[int, str] = {}
+            # 4) Aplicar cambios al snapshot (contadores y agrupación por tipo)
+            _format_case_dates(cases_raw)
+            snap.apply(cases_raw, lambda c: _normalize_case(c, customer_map), full=plan.full)
 
-    for cid in customer_ids:
+    # 5) Ventana por tipo: solo se renderizan las filas más recientes;
+    #    el resto se pide bajo demanda con ?format=rows&type=X&page=N
+    per_type = cfg.get("DASHBOARD_ROWS_PER_TYPE", 25)
+    by_updated = sort_key("updated_at")
+
+    if rows_only:
         try:
-            r = get(f"/api/customers/{cid}", headers=headers)
-            print(f"[CUSTOMER FETCH] {cid} -> {getattr(r, 'status_code', '?')}")
-            if getattr(r, "ok", False):
-                data = r.json() or {}
-                # puede venir plano {"id":..,"name":..} o envuelto {"customer":{...}}
-                cust = data.get("customer", data)
-                name = _first_non_empty(cust.get("name"), f"Cliente #{cid}")
-            else:
-                name = f"Cliente #{cid}"
-        except Exception as e:
-            print(f"[CUSTOMER ERROR] {cid} -> {e}")
-            name = f"Cliente #{cid}"
-        _CUSTOMER_CACHE[cid] = name
-        customer_map[cid] = name
-
-    # 4) Armar KPI y agrupación por tipo
-    por_estado = defaultdict(int)
-    cases_by_type = defaultdict(list)
-
-    for c in cases_raw:
-        case_type = _first_non_empty(c.get("case_type"), c.get("type"), "Otros")
-        state = _first_non_empty(c.get("state"), "—")
-        title = _first_non_empty(c.get("title"), c.get("code"), f"Caso #{c.get('id')}")
-        updated_at = _first_non_empty(c.get("updated_at"), c.get("created_at"), "")
-        cid = c.get("customer_id")
-        customer_nombre = (
-            customer_map.get(cid)
-            or ((c.get("customer") or {}).get("name") if isinstance(c.get("customer"), dict) else None)
-            or c.get("customer_nombre")
-            or (f"Cliente #{cid}" if cid else "—")
-        )
-
-        #Display de hora y zona horaria
-        src_iso = _first_non_empty(c.get("updated_at"), c.get("created_at"), "")
-        iso_val, disp_val = _format_timestamp_local(src_iso)
-
-        norm = {
-            "id": c.get("id"),
-            "code": c.get("code"),
-            "case_type": case_type,
-            "state": state,
-            "state_lower": (state or "").lower(),
-            "title": title,
-            "updated_at": iso_val,
-            "updated_at_display": disp_val,
-            "customer_nombre": customer_nombre,
-        }
-
-        por_estado[state] += 1
-        cases_by_type[case_type].append(norm)
-
-    # Ordenar tipos por cantidad
-    cases_by_type = OrderedDict(sorted(cases_by_type.items(), key=lambda kv: len(kv[1]), reverse=True))
+            page_no = max(1, int(request.args.get("page", 2)))
+        except ValueError:
+            page_no = 2
+        page = window(snap.group_rows(request.args.get("type"), by_updated),
+                      PageRequest(page_no, per_type, sort="updated_at", order="desc"),
+                      presorted=True)
+        return jsonify({
+            "ok": True,
+            "html": render_fragment("dashboard/_rows.html", lista=page.items),
+            **page.meta(),
+        })
+
+    # Tipos ordenados por cantidad
+    groups = OrderedDict(
+        (tipo, window(snap.group_rows(tipo, by_updated),
+                      PageRequest(1, per_type, sort="updated_at", order="desc"),
+                      presorted=True))
+        for tipo in snap.type_counts()
+    )
 
     return render_template(
         "dashboard/index.html",
-        total=len(cases_raw),
-        sla=len(sla_breaches),
-        por_estado=dict(por_estado),
-        cases_by_type=cases_by_type,
+        total=snap.total,
+        sla=sla_breaches.count if sla_breaches else 0,
+        sla_version=sla_breaches.version if sla_breaches else "",
+        por_estado=dict(snap.por_estado),
+        cases_by_type=OrderedDict((tipo, page.items) for tipo, page in groups.items()),
+        type_pages=groups,
     )
@@ -1,14 +1,81 @@
-from flask import Blueprint, render_template, request, jsonify
-from ..utils.api import get, post
+import json
+import queue
+import time
+
+from flask import Blueprint, render_template, request, jsonify, Response, current_app, stream_with_context
+from ..utils.api import post
 from ..utils.auth import auth_header
+from ..utils.fragments import render_fragment
+from ..utils.sla_feed import sla_feed
 
 bp = Blueprint("sla", __name__, template_folder="../templates")
 
 @bp.get("/")
 def list_breaches():
+    """
+    SLA vencidos desde el snapshot compartido del proceso (utils/sla_feed.py),
+    no una llamada al backend por vista. ?format=rows devuelve solo las filas
+    (lo usa la página cuando /sla/stream avisa un cambio).
+    """
     token = request.cookies.get("jwt")
-    data = get("/api/cases/sla-breaches", headers=auth_header(token)).json()
-    return render_template("sla/list.html", items=data.get("items", []))
+    snap = sla_feed("list").snapshot(auth_header(token))
+    if request.args.get("format") == "rows":
+        return jsonify({
+            "ok": True,
+            "html": render_fragment("sla/_rows.html", items=snap.items),
+            "count": snap.count,
+            "version": snap.version,
+        })
+    return render_template("sla/list.html", items=snap.items, version=snap.version)
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@bp.get("/stream")
+def breaches_stream():
+    """
+    Server-Sent Events con los cambios del set de SLA vencidos (?feed=list|dashboard):
+    - event: breaches {"version", "count"}  al conectar y cada vez que cambia
+    Keep-alive cada SLA_SSE_KEEPALIVE segundos; así también se detecta al
+    cliente que se fue y se da de baja el stream (con el último del scope
+    se descarta su token). Como el SSE del chat, ocupa un thread del worker
+    mientras está abierto; se cierra a los SLA_SSE_MAX_SECONDS y EventSource
+    reconecta solo.
+    """
+    name = request.args.get("feed", "list")
+    if name not in ("list", "dashboard"):
+        return jsonify({"ok": False, "error": "feed inválido"}), 400
+    headers = auth_header(request.cookies.get("jwt"))
+    cfg = current_app.config
+    keepalive = cfg.get("SLA_SSE_KEEPALIVE", 15)
+    max_seconds = cfg.get("SLA_SSE_MAX_SECONDS", 300)
+
+    feed = sla_feed(name)
+    feed.snapshot(headers)
+    key, events = feed.subscribe(headers)
+
+    def generate():
+        started = time.monotonic()
+        sent = None
+        yield "retry: 5000\n\n"
+        try:
+            while time.monotonic() - started < max_seconds:
+                snap = feed.current(key)
+                if snap is not None and snap.version != sent:
+                    sent = snap.version
+                    yield _sse("breaches", {"version": snap.version, "count": snap.count})
+                try:
+                    events.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            feed.unsubscribe(key, events)
+
+    return Response(stream_with_context(generate()), headers={
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx: no bufferizar
+    })
 
 @bp.post("/notify")
 def simulate_notify():
@@ -4,3 +4,126 @@ class AppConfig:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
     API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
     TZ = os.getenv("TZ", "America/Asuncion")
+
+    # Pool HTTP hacia el backend (keep-alive, conexiones reutilizadas)
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))  # hosts distintos cacheados
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))          # conexiones por host
+    HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "0") == "1"
+    API_FANOUT_WORKERS = int(os.getenv("API_FANOUT_WORKERS", "16"))        # threads para llamadas en paralelo
+
+    # Chat por SSE
+    ASSISTANT_STREAM_PATH = os.getenv("ASSISTANT_STREAM_PATH", "/api/assistant/chat/stream")
+    CHAT_SSE_KEEPALIVE = int(os.getenv("CHAT_SSE_KEEPALIVE", "10"))  # segundos sin datos antes de un keep-alive
+
+    # Dashboard: resolución de nombres de clientes
+    CUSTOMER_LOOKUP_WORKERS = int(os.getenv("CUSTOMER_LOOKUP_WORKERS", "8"))  # fetch individuales en paralelo
+    CUSTOMER_BULK_LOOKUP = os.getenv("CUSTOMER_BULK_LOOKUP", "1") == "1"       # probar /api/customers?ids=
+
+    # Caché de nombres de clientes (LRU + TTL + negative caching)
+    CUSTOMER_CACHE_MAXSIZE = int(os.getenv("CUSTOMER_CACHE_MAXSIZE", "5000"))
+    CUSTOMER_CACHE_TTL = int(os.getenv("CUSTOMER_CACHE_TTL", "900"))                 # segundos
+    CUSTOMER_CACHE_NEGATIVE_TTL = int(os.getenv("CUSTOMER_CACHE_NEGATIVE_TTL", "60"))  # lookups fallidos
+    # Archivo SQLite compartido entre workers del host (vacío = solo memoria)
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+
+    # Caché stale-while-revalidate de /config/api/* (GET)
+    CONFIG_CACHE_TTL = int(os.getenv("CONFIG_CACHE_TTL", "60"))              # fresca: sin ir al backend
+    CONFIG_CACHE_STALE_TTL = int(os.getenv("CONFIG_CACHE_STALE_TTL", "600"))  # stale: se sirve y se revalida
+    CONFIG_CACHE_MAXSIZE = int(os.getenv("CONFIG_CACHE_MAXSIZE", "2048"))
+    CONFIG_INVALIDATION_SYNC = float(os.getenv("CONFIG_INVALIDATION_SYNC", "0.2"))  # cada cuánto se leen las invalidaciones de otros workers
+
+    # Cotizaciones (/cases/quote): caché corta por body + versión de FX/pricing
+    QUOTE_CACHE_TTL = int(os.getenv("QUOTE_CACHE_TTL", "30"))
+    QUOTE_CACHE_MAXSIZE = int(os.getenv("QUOTE_CACHE_MAXSIZE", "2000"))
+
+    # Paginación de listados
+    CASES_PAGE_SIZE = int(os.getenv("CASES_PAGE_SIZE", "50"))
+    CASES_PAGE_MAX = int(os.getenv("CASES_PAGE_MAX", "200"))
+    DASHBOARD_ROWS_PER_TYPE = int(os.getenv("DASHBOARD_ROWS_PER_TYPE", "25"))
+
+    # Dashboard: snapshot incremental de casos por token
+    DASHBOARD_MIN_SYNC = int(os.getenv("DASHBOARD_MIN_SYNC", "5"))            # segundos sin volver a pedir deltas
+    DASHBOARD_FULL_RESYNC = int(os.getenv("DASHBOARD_FULL_RESYNC", "120"))    # resync completo cada N segundos (los borrados solo se ven así)
+    DASHBOARD_SNAPSHOT_SCOPES = int(os.getenv("DASHBOARD_SNAPSHOT_SCOPES", "100"))
+    CASES_DELTA_PARAM = os.getenv("CASES_DELTA_PARAM", "updated_since")
+
+    # Logging (logger "selva", asíncrono vía cola)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_JSON = os.getenv("LOG_JSON", "0") == "1"                  # una línea JSON por evento
+    LOG_PAYLOADS = os.getenv("LOG_PAYLOADS", "0") == "1"          # volcar bodies del backend (con LOG_LEVEL=DEBUG)
+    LOG_BODY_MAX = int(os.getenv("LOG_BODY_MAX", "500"))          # caracteres por body logueado
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))    # si se llena, se descartan records
+    LOG_SAMPLE_DEFAULT = float(os.getenv("LOG_SAMPLE_DEFAULT", "1.0"))
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")          # "dashboard.index=0.1,cases=0.5"
+
+    # Métricas (texto Prometheus en memoria del proceso)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")                # Bearer para el scraper; vacío = ruta no registrada
+
+    # Adjuntos: presign/commit de varios archivos en una llamada
+    ATTACHMENTS_BATCH_MAX = int(os.getenv("ATTACHMENTS_BATCH_MAX", "20"))          # archivos por presign/commit batch
+    ATTACHMENTS_BATCH_WORKERS = int(os.getenv("ATTACHMENTS_BATCH_WORKERS", "6"))   # llamadas al backend en paralelo
+
+    # Resiliencia del cliente API: breakers por path, timeouts adaptativos, reintentos
+    BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))                  # fallas seguidas que abren el breaker
+    BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "10"))       # primera apertura (se duplica al reabrir)
+    BREAKER_MAX_OPEN_SECONDS = float(os.getenv("BREAKER_MAX_OPEN_SECONDS", "120"))
+    API_TIMEOUT_FACTOR = float(os.getenv("API_TIMEOUT_FACTOR", "3.0"))          # timeout = p99 * factor
+    API_TIMEOUT_FLOOR = float(os.getenv("API_TIMEOUT_FLOOR", "2.0"))            # nunca menos que esto (techo: 30s GET / 60s escrituras)
+    API_LATENCY_WINDOW = int(os.getenv("API_LATENCY_WINDOW", "200"))            # latencias recordadas por path
+    API_LATENCY_MIN_SAMPLES = int(os.getenv("API_LATENCY_MIN_SAMPLES", "20"))   # antes de esto, timeout fijo
+    API_GET_RETRIES = int(os.getenv("API_GET_RETRIES", "2"))                    # solo GET/HEAD/OPTIONS
+    API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.2"))            # base del backoff con jitter
+    API_RETRY_BUDGET_RATIO = float(os.getenv("API_RETRY_BUDGET_RATIO", "0.1"))  # reintentos por request (≈10%)
+    API_RETRY_BUDGET_MAX = float(os.getenv("API_RETRY_BUDGET_MAX", "20"))
+
+    # Assets estáticos con hash de contenido (utils/assets.py)
+    ASSETS_URL_PREFIX = os.getenv("ASSETS_URL_PREFIX", "/assets")
+    ASSETS_MAX_AGE = int(os.getenv("ASSETS_MAX_AGE", str(365 * 24 * 3600)))  # inmutables: el hash cambia con el contenido
+    ASSETS_HASH_LEN = int(os.getenv("ASSETS_HASH_LEN", "10"))
+    ASSETS_GZIP_LEVEL = int(os.getenv("ASSETS_GZIP_LEVEL", "9"))             # se comprime una vez por proceso
+    ASSETS_AUTO_RELOAD = os.getenv("ASSETS_AUTO_RELOAD", "0") == "1"         # re-hashear si cambia el archivo (dev)
+    GZIP_ENABLED = os.getenv("GZIP_ENABLED", "1") == "1"                     # gzip de HTML/JSON al vuelo
+    GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+    # Caché de fragmentos HTML por hash de contenido (utils/fragments.py)
+    FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE_ENABLED", "1") == "1"
+    FRAGMENT_CACHE_MAXSIZE = int(os.getenv("FRAGMENT_CACHE_MAXSIZE", "500"))            # fragmentos en memoria (LRU)
+    FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("FRAGMENT_CACHE_MAX_BYTES", str(256 * 1024)))  # los más grandes no se guardan
+    FRAGMENT_CACHE_TTL = int(os.getenv("FRAGMENT_CACHE_TTL", "3600"))                   # libera grupos que ya no se piden
+
+    # /api/batch: lecturas de bootstrap de páginas en un solo round trip
+    BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "10"))   # sub-requests por batch
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "6"))              # llamadas al backend en paralelo
+    BATCH_TIMEOUT = float(os.getenv("BATCH_TIMEOUT", "30"))           # deadline del batch completo
+
+    # Índice local de clientes por teléfono (/cases/customer-lookup)
+    CUSTOMER_INDEX_SCOPES = int(os.getenv("CUSTOMER_INDEX_SCOPES", "100"))        # un índice por token
+    CUSTOMER_INDEX_MAXSIZE = int(os.getenv("CUSTOMER_INDEX_MAXSIZE", "50000"))    # teléfonos por índice
+    CUSTOMER_INDEX_TTL = int(os.getenv("CUSTOMER_INDEX_TTL", "3600"))             # después se confirma contra el backend
+    CUSTOMER_INDEX_MIN_PREFIX = int(os.getenv("CUSTOMER_INDEX_MIN_PREFIX", "4"))  # dígitos mínimos para ?prefix=1
+    CUSTOMER_INDEX_PREFIX_LIMIT = int(os.getenv("CUSTOMER_INDEX_PREFIX_LIMIT", "10"))
+
+    # Servidor de producción (gunicorn.conf.py / wsgi.py)
+    WEB_BIND = os.getenv("WEB_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))                       # 0 = 2 * CPUs + 1
+    WEB_THREADS = int(os.getenv("WEB_THREADS", "8"))                       # por worker (gthread; cada SSE ocupa uno, el del chat dos)
+    WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "90"))                      # > timeout de escrituras al backend (60s)
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))    # para terminar requests en vuelo al recargar
+    WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+    WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "0"))             # reciclar workers cada N requests (0 = nunca)
+    WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "0"))
+    WEB_PRELOAD = os.getenv("WEB_PRELOAD", "1") == "1"                     # importar la app en el master y forkear
+    WEB_LAZY_BLUEPRINTS = os.getenv("WEB_LAZY_BLUEPRINTS", "1") == "1"     # importar las vistas en el primer request
+    STARTUP_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "500"))         # import + create_app (bench/startup.py)
+
+    # SLA vencidos: snapshot compartido por proceso + avisos por SSE (utils/sla_feed.py)
+    SLA_BREACHES_PATH = os.getenv("SLA_BREACHES_PATH", "/api/cases/sla-breaches")  # listado /sla/
+    SLA_DASHBOARD_PATH = os.getenv("SLA_DASHBOARD_PATH", "/api/sla/breaches")      # KPI del dashboard
+    SLA_POLL_INTERVAL = float(os.getenv("SLA_POLL_INTERVAL", "15"))     # segundos entre polls al backend (scopes con streams)
+    SLA_POLL_WORKERS = int(os.getenv("SLA_POLL_WORKERS", "4"))          # scopes refrescados en paralelo
+    SLA_FEED_SCOPES = int(os.getenv("SLA_FEED_SCOPES", "100"))          # tokens distintos en memoria
+    SLA_SSE_KEEPALIVE = int(os.getenv("SLA_SSE_KEEPALIVE", "15"))       # segundos sin cambios antes de un keep-alive
+    SLA_SSE_MAX_SECONDS = int(os.getenv("SLA_SSE_MAX_SECONDS", "300"))  # después el browser reconecta
@@ -0,0 +1,37 @@
+// Bootstrap de páginas: varias lecturas en un solo POST /api/batch.
+// Se carga antes del script de la página (app.js va al final del body).
+
+// paths: { id: '/api/config/fx', ... }  ->  { id: { status, body } | { status, error } }
+async function appBatch(paths){
+  const requests = Object.entries(paths).map(([id, path]) => ({ id, path }));
+  const r = await fetch('/api/batch', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ requests })
+  });
+  if (!r.ok) throw new Error(await r.text());
+  return (await r.json()).results || {};
+}
+
+// Precarga de URLs /config/api/* en un round trip; takePrefetched(url)
+// devuelve una vez el body ya traído (o undefined -> pedirlo como siempre).
+const _PREFETCHED = new Map();
+
+async function prefetchConfig(urls){
+  const paths = Object.fromEntries(urls.map(u => [u, u.replace(/^\/config\/api\//, '/api/config/')]));
+  try {
+    const results = await appBatch(paths);
+    Object.entries(results).forEach(([url, res]) => {
+      if (res && res.status >= 200 && res.status < 300 && 'body' in res) _PREFETCHED.set(url, res.body);
+    });
+  } catch (e) {
+    console.warn('[batch] falló, se carga uno por uno:', e);
+  }
+}
+
+function takePrefetched(url){
+  if (!_PREFETCHED.has(url)) return undefined;
+  const body = _PREFETCHED.get(url);
+  _PREFETCHED.delete(url);
+  return body;
+}
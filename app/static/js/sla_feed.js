@@ -0,0 +1,23 @@
+// Avisos de cambios en los SLA vencidos (SSE de /sla/stream?feed=...).
+// watchSlaBreaches(feed, version, onChange): onChange({ version, count }) se llama
+// solo si el set difiere de `version` (la que se renderizó); si devuelve una
+// versión (p.ej. la de las filas que trajo) se toma como la vigente.
+// Al cerrar la pestaña se cierra el stream y el servidor deja de consultar el backend.
+function watchSlaBreaches(feed, version, onChange){
+  if (!window.EventSource) return null;
+  let current = version;
+  const es = new EventSource(`/sla/stream?feed=${encodeURIComponent(feed)}`);
+  es.addEventListener('breaches', async (ev) => {
+    const data = JSON.parse(ev.data);
+    if (data.version === current) return;
+    current = data.version;
+    try {
+      const loaded = await onChange(data);
+      if (loaded) current = loaded;
+    } catch (e) {
+      console.warn('[sla] no se pudo actualizar:', e);
+    }
+  });
+  window.addEventListener('pagehide', () => es.close());
+  return es;
+}
@@ -0,0 +1,177 @@
+# app/utils/aggregates.py
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from .cache import TTLCache, MISSING
+from .formatting import parse_iso
+
+
+class SyncPlan:
+    """
+    Qué hay que pedirle al backend para poner al día un snapshot.
+    - full=True: listado completo (primera vez, forzado o por intervalo).
+    - full=False: solo lo cambiado desde `params[delta_param]`.
+    """
+    __slots__ = ("full", "params")
+
+    def __init__(self, full: bool, params: dict):
+        self.full = full
+        self.params = params
+
+
+class CaseSnapshot:
+    """
+    Snapshot incremental de los casos de un scope (token):
+    filas normalizadas por id + contadores por estado y por tipo.
+
+    apply() hace upsert de los casos recibidos y ajusta los contadores con la
+    diferencia (resta el estado/tipo viejo, suma el nuevo), así que el costo
+    es proporcional a los cambios y no al total de casos.
+    """
+
+    def __init__(self, delta_param: str = "updated_since"):
+        self.delta_param = delta_param
+        self.rows: dict = {}                 # id -> fila normalizada
+        self.por_estado: Counter = Counter()
+        self.by_type: dict = {}              # tipo -> {id: fila}
+        self.watermark: str = ""             # max(updated_at) visto, tal como lo manda el backend
+        self._watermark_dt = None            # el mismo, parseado (se compara por fecha, no por string)
+        self.synced_at = 0.0
+        self.full_synced_at = 0.0
+        self.delta_supported: bool | None = None  # ¿el backend filtra por delta_param?
+        self.delta_checked_at = 0.0
+        self._sorted: dict = {}              # tipo -> filas ordenadas (cache hasta que el tipo cambie)
+        self._lock = threading.RLock()
+
+    # --- planificación ---
+
+    def plan(self, *, min_interval: float, full_interval: float, force: bool = False) -> SyncPlan | None:
+        now = time.time()
+        with self._lock:
+            if force or not self.full_synced_at or now - self.full_synced_at >= full_interval:
+                return SyncPlan(True, {})
+            # El backend ignoró el delta la última vez: completo hasta volver a probar
+            if self.delta_supported is False and now - self.delta_checked_at < full_interval:
+                if now - self.synced_at < min_interval:
+                    return None
+                return SyncPlan(True, {})
+            if now - self.synced_at < min_interval:
+                return None  # recién sincronizado: se sirve tal cual
+            params = {self.delta_param: self.watermark} if self.watermark else {}
+            return SyncPlan(not params, params)
+
+    # --- aplicación de cambios ---
+
+    def apply(self, cases: list, normalize, *, full: bool = False):
+        """
+        Upsert de `cases` (dicts crudos del backend). `normalize(case)` devuelve
+        la fila normalizada (con "id", "case_type", "state"). Los casos con
+        "deleted": true se quitan del snapshot.
+        Con full=True se descarta lo anterior (resync completo).
+
+        Si un delta trae casos con updated_at anterior al watermark pedido, el
+        backend ignoró el filtro (mandó todo): se aplica como reemplazo completo
+        y los próximos syncs se piden completos (ver plan()).
+        """
+        with self._lock:
+            if not full and self._watermark_dt is not None and cases:
+                older = any(
+                    (dt := parse_iso(c.get("updated_at") or c.get("created_at"))) is not None
+                    and dt < self._watermark_dt
+                    for c in cases
+                )
+                self.delta_supported = not older
+                self.delta_checked_at = time.time()
+                full = older
+
+            if full:
+                self.rows.clear()
+                self.por_estado.clear()
+                self.by_type.clear()
+                self._sorted.clear()
+                self.watermark = ""
+                self._watermark_dt = None
+
+            for c in cases:
+                cid = c.get("id")
+                if cid is None:
+                    continue
+                old = self.rows.pop(cid, None)
+                if old is not None:
+                    self._remove(cid, old)
+                if c.get("deleted"):
+                    continue  # borrado informado por el delta
+
+                row = normalize(c)
+
+                self.rows[cid] = row
+                self.por_estado[row["state"]] += 1
+                self.by_type.setdefault(row["case_type"], {})[cid] = row
+                self._sorted.pop(row["case_type"], None)
+
+                ts = c.get("updated_at") or c.get("created_at") or ""
+                dt = parse_iso(ts)
+                if dt is not None and (self._watermark_dt is None or dt > self._watermark_dt):
+                    self.watermark, self._watermark_dt = ts, dt
+
+            now = time.time()
+            self.synced_at = now
+            if full:
+                self.full_synced_at = now
+
+    def _remove(self, cid, old):
+        self.por_estado[old["state"]] -= 1
+        if self.por_estado[old["state"]] <= 0:
+            del self.por_estado[old["state"]]
+        group = self.by_type.get(old["case_type"])
+        if group is not None:
+            group.pop(cid, None)
+            if not group:
+                del self.by_type[old["case_type"]]
+        self._sorted.pop(old["case_type"], None)
+
+    # --- lectura ---
+
+    @property
+    def total(self) -> int:
+        return len(self.rows)
+
+    def type_counts(self) -> "OrderedDict[str, int]":
+        """Tipos ordenados por cantidad (desc)."""
+        with self._lock:
+            return OrderedDict(sorted(((t, len(g)) for t, g in self.by_type.items()),
+                                      key=lambda kv: kv[1], reverse=True))
+
+    def group_rows(self, case_type: str, sort_key, reverse: bool = True) -> list:
+        """
+        Filas de un tipo ya ordenadas; el orden se recalcula solo si el tipo cambió.
+        """
+        with self._lock:
+            rows = self._sorted.get(case_type)
+            if rows is None:
+                rows = sorted(self.by_type.get(case_type, {}).values(), key=sort_key, reverse=reverse)
+                self._sorted[case_type] = rows
+            return rows
+
+
+class SnapshotStore:
+    """
+    Snapshots por scope, acotados (LRU) para no crecer sin límite.
+    """
+
+    def __init__(self, max_scopes: int = 100, delta_param: str = "updated_since"):
+        self.delta_param = delta_param
+        self._snaps = TTLCache(maxsize=max_scopes, ttl=float("inf"), namespace="case_snapshots")
+        self._lock = threading.Lock()
+
+    def get(self, scope: str) -> CaseSnapshot:
+        with self._lock:
+            snap = self._snaps.get(scope)
+            if snap is MISSING:
+                snap = CaseSnapshot(self.delta_param)
+                self._snaps.set(scope, snap)
+            return snap
+
+    def drop(self, scope: str):
+        self._snaps.delete(scope)
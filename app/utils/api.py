@@ -1,29 +1,190 @@
 # app/utils/api.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import current_app
 
+from .metrics import observe_upstream, path_template
+from .resilience import UpstreamUnavailable, resilience
+
 DEFAULT_TIMEOUT_GET = 30
 DEFAULT_TIMEOUT_WRITE = 60
 
+# Métodos idempotentes que se pueden reintentar sin efectos secundarios
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Status del backend que se reintentan en métodos idempotentes
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class ClientPool:
+    """
+    Pool de conexiones HTTP compartido por todo el proceso.
+
+    - Un único HTTPAdapter (urllib3 PoolManager, thread-safe) mantiene las
+      conexiones keep-alive abiertas por host.
+    - Cada thread usa su propia requests.Session (las Session no son
+      thread-safe por el cookie jar), pero todas montan el mismo adapter,
+      así que comparten las conexiones ya establecidas.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 20,
+                 pool_block: bool = False):
+        # Sin reintentos en el adapter: la única política es la de _request
+        # (backoff + presupuesto global + breaker); reintentar también acá
+        # multiplicaría los intentos por fuera de esa cuenta
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=Retry(total=0, read=False, redirect=False, raise_on_status=False),
+        )
+        self._local = threading.local()
+
+    def session(self) -> requests.Session:
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = requests.Session()
+            s.mount("http://", self.adapter)
+            s.mount("https://", self.adapter)
+            s.headers["Connection"] = "keep-alive"
+            self._local.session = s
+        return s
+
+    def close(self):
+        self.adapter.close()
+
+
+_POOL: ClientPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def client_pool() -> ClientPool:
+    """
+    Devuelve el pool del proceso; se crea la primera vez con la config de la app.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                cfg = current_app.config
+                _POOL = ClientPool(
+                    pool_connections=cfg.get("HTTP_POOL_CONNECTIONS", 10),
+                    pool_maxsize=cfg.get("HTTP_POOL_MAXSIZE", 20),
+                    pool_block=cfg.get("HTTP_POOL_BLOCK", False),
+                )
+    return _POOL
+
+
+def reset_client_pool():
+    """
+    Cierra el pool actual (útil tras un fork o al cambiar la config).
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.close()
+        _POOL = None
+
+
 def api_base() -> str:
     base = current_app.config["API_BASE_URL"]
     return base.rstrip("/")
 
-def _request(method: str, path: str, *, params=None, json=None, headers=None, files=None, data=None, timeout=None):
-    url = f"{api_base()}{path}"
-    # GET usa timeout más corto por defecto, el resto más largo
+def request_url(method: str, url: str, *, params=None, json=None, headers=None, files=None, data=None, timeout=None, stream=False, metric_path=None):
+    """
+    Igual que _request pero con URL absoluta (p. ej. URLs presignadas de S3),
+    reutilizando el mismo pool de conexiones.
+    `metric_path` es el path con el que se registra la latencia (las URLs
+    absolutas sin path se agrupan como "external").
+    """
     if timeout is None:
         timeout = DEFAULT_TIMEOUT_GET if method.upper() == "GET" else DEFAULT_TIMEOUT_WRITE
-    return requests.request(
-        method=method.upper(),
-        url=url,
-        params=params,
-        json=json,
-        headers=headers or {},
-        files=files,
-        data=data,
-        timeout=timeout
-    )
+    t0 = time.perf_counter()
+    try:
+        r = client_pool().session().request(
+            method=method.upper(),
+            url=url,
+            params=params,
+            json=json,
+            headers=headers or {},
+            files=files,
+            data=data,
+            timeout=timeout,
+            stream=stream
+        )
+    except Exception as e:
+        observe_upstream(method, metric_path or url, t0, error=e)
+        raise
+    size = r.headers.get("Content-Length")
+    if size is None and not stream:
+        size = len(r.content)
+    observe_upstream(method, metric_path or url, t0, status=r.status_code,
+                     size=int(size) if str(size).isdigit() else None)
+    return r
+
+def _request(method: str, path: str, *, params=None, json=None, headers=None, files=None, data=None, timeout=None, stream=False):
+    """
+    Llamada al backend con:
+    - circuit breaker por path template: si está abierto se lanza
+      UpstreamUnavailable sin ir a la red;
+    - timeout adaptativo (p99 observado * factor) si no se pasa uno, nunca
+      mayor que el fijo de siempre (GET 30 s, escrituras 60 s);
+    - reintentos con backoff y jitter solo en métodos idempotentes, ante
+      errores de red o 502/503/504, limitados por el presupuesto global.
+    """
+    method = method.upper()
+    url = f"{api_base()}{path}"
+    guard = resilience()
+    tpl = path_template(path)
+    breaker = guard.breaker(tpl)
+    if timeout is None:
+        # GET usa timeout más corto por defecto, el resto más largo
+        ceiling = DEFAULT_TIMEOUT_GET if method == "GET" else DEFAULT_TIMEOUT_WRITE
+        timeout = guard.timeout(method, tpl, ceiling)
+    retryable = method in IDEMPOTENT_METHODS and files is None
+    guard.budget.deposit()
+
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call(tpl)
+        except UpstreamUnavailable as e:
+            observe_upstream(method, path, time.perf_counter(), error=e)
+            raise
+
+        t0 = time.perf_counter()
+        try:
+            r = request_url(method, url, params=params, json=json, headers=headers,
+                            files=files, data=data, timeout=timeout, stream=stream,
+                            metric_path=path)
+        except (requests.Timeout, requests.ConnectionError):
+            breaker.record_failure()
+            if retryable and attempt < guard.retries and breaker.closed and guard.budget.withdraw():
+                time.sleep(guard.backoff(attempt))
+                attempt += 1
+                continue
+            raise
+        except Exception:
+            breaker.release_probe()
+            raise
+
+        if r.status_code >= 500:
+            breaker.record_failure()
+            if (r.status_code in RETRY_STATUSES and retryable and attempt < guard.retries
+                    and breaker.closed and guard.budget.withdraw()):
+                r.close()
+                time.sleep(guard.backoff(attempt))
+                attempt += 1
+                continue
+        else:
+            breaker.record_success()
+            guard.latency(method, tpl).observe(time.perf_counter() - t0)
+        return r
 
 def get(path: str, params=None, headers=None):
     return _request("GET", path, params=params, headers=headers)
@@ -40,3 +201,131 @@ def delete(path: str, headers=None):
 
 def patch(path: str, json=None, headers=None):
     return _request("PATCH", path, json=json, headers=headers)
+
+
+# ===============================
+# Fan-out de requests independientes
+# ===============================
+_EXECUTOR: ThreadPoolExecutor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    """
+    Pool de threads del proceso para llamadas concurrentes al backend.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=current_app.config.get("API_FANOUT_WORKERS", 16),
+                    thread_name_prefix="api-fanout",
+                )
+    return _EXECUTOR
+
+
+class FanOutResult:
+    """
+    Resultado de una llamada dentro de fan_out:
+    - response: el requests.Response, si la llamada devolvió uno
+    - data: el JSON ya parseado de `response` (None si no era JSON)
+    - value: lo que devolvió la llamada si no era un requests.Response
+      (p.ej. un nombre ya resuelto o una tupla (json, status))
+    - error: la excepción, si la hubo
+    """
+    __slots__ = ("response", "data", "value", "error", "elapsed")
+
+    def __init__(self, response=None, data=None, value=None, error=None, elapsed=0.0):
+        self.response = response
+        self.data = data
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(getattr(self.response, "ok", False))
+
+    @property
+    def status_code(self):
+        return getattr(self.response, "status_code", None)
+
+    def __repr__(self):
+        return f"<FanOutResult status={self.status_code} error={self.error!r}>"
+
+
+def in_app_context(fn):
+    """
+    Envuelve `fn` para que corra dentro del app context actual desde otro thread.
+    """
+    app = current_app._get_current_object()
+
+    def run(*args, **kwargs):
+        with app.app_context():
+            return fn(*args, **kwargs)
+    return run
+
+
+def _run_call(fn) -> FanOutResult:
+    t0 = time.perf_counter()
+    try:
+        r = fn()
+    except Exception as e:
+        return FanOutResult(error=e, elapsed=time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t0
+    if not isinstance(r, requests.Response):
+        return FanOutResult(value=r, elapsed=elapsed)
+    try:
+        data = r.json()
+    except ValueError:
+        data = None
+    return FanOutResult(response=r, data=data, elapsed=elapsed)
+
+
+def fan_out(calls: dict, *, max_concurrency: int | None = None, timeout: float | None = None) -> dict:
+    """
+    Ejecuta en paralelo llamadas independientes al backend y junta los resultados.
+
+        results = fan_out({
+            "cases": partial(get, "/api/cases", headers=h),
+            "sla":   partial(get, "/api/sla/breaches", headers=h),
+        })
+        results["cases"].data
+
+    - Cada valor es un callable sin argumentos (típicamente get/post con partial);
+      si no devuelve un requests.Response, el resultado queda en `.value`.
+    - Los errores quedan aislados por llamada en FanOutResult.error; nunca se propagan.
+    - `max_concurrency` limita cuántas llamadas de este fan-out corren a la vez.
+    - `timeout` es un deadline global; lo que no terminó queda con TimeoutError.
+    No anidar fan_out dentro de una llamada de otro fan_out (comparten el pool).
+    """
+    if not calls:
+        return {}
+
+    pool = executor()
+    limit = max_concurrency or len(calls)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = list(calls.items())
+    in_flight = {}
+    results: dict = {}
+
+    while pending or in_flight:
+        while pending and len(in_flight) < limit:
+            key, fn = pending.pop(0)
+            in_flight[pool.submit(in_app_context(_run_call), fn)] = key
+
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+        if not done:
+            # Deadline vencido: lo que sigue en vuelo o pendiente se marca como timeout
+            for fut, key in in_flight.items():
+                fut.cancel()
+                results[key] = FanOutResult(error=TimeoutError(f"fan_out: {key} excedió {timeout}s"))
+            for key, _fn in pending:
+                results[key] = FanOutResult(error=TimeoutError(f"fan_out: {key} no se ejecutó"))
+            break
+        for fut in done:
+            results[in_flight.pop(fut)] = fut.result()
+
+    return {key: results[key] for key in calls}
@@ -0,0 +1,203 @@
+# app/utils/assets.py
+import gzip
+import hashlib
+import mimetypes
+import os
+import string
+import threading
+
+from flask import Response, abort, current_app, request, url_for
+
+# Tipos que vale la pena comprimir (las imágenes/fuentes ya vienen comprimidas)
+COMPRESSIBLE = frozenset({
+    "text/html", "text/css", "text/plain", "text/csv", "text/javascript",
+    "application/javascript", "application/json", "image/svg+xml",
+})
+
+
+class Asset:
+    """
+    Un archivo de static/ con su hash de contenido y su variante gzip
+    (tomada de `<archivo>.gz` si está al día o comprimida una vez en memoria).
+    """
+
+    __slots__ = ("path", "mtime", "digest", "body", "gz", "mimetype")
+
+    def __init__(self, path: str, hash_len: int, gzip_level: int):
+        with open(path, "rb") as f:
+            self.body = f.read()
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self.digest = hashlib.sha256(self.body).hexdigest()[:hash_len]
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.gz = None
+        if self.mimetype.split(";")[0] in COMPRESSIBLE:
+            self.gz = _precompressed(path, self.mtime) or gzip.compress(self.body, gzip_level, mtime=0)
+
+
+def _precompressed(path: str, mtime: float) -> bytes | None:
+    gz_path = path + ".gz"
+    try:
+        if os.path.getmtime(gz_path) >= mtime:
+            with open(gz_path, "rb") as f:
+                return f.read()
+    except OSError:
+        pass
+    return None
+
+
+def hashed_name(filename: str, digest: str) -> str:
+    # "js/cases/detail.js" -> "js/cases/detail.3fa2b1c9d0.js"
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{digest}{ext}"
+
+
+def split_hashed(filename: str, hash_len: int) -> tuple[str, str | None]:
+    # Inversa de hashed_name: ("js/cases/detail.js", "3fa2b1c9d0")
+    base, ext = os.path.splitext(filename)
+    stem, dot, digest = base.rpartition(".")
+    if not dot or len(digest) != hash_len or not all(ch in string.hexdigits for ch in digest):
+        return filename, None
+    return stem + ext, digest
+
+
+class AssetStore:
+    """
+    Manifest en memoria de static/: nombre lógico -> Asset. Se llena a
+    demanda; con `auto_reload` (modo debug) revisa el mtime en cada uso
+    para que los cambios se vean sin reiniciar.
+    """
+
+    def __init__(self, root: str, hash_len: int = 10, gzip_level: int = 9, auto_reload: bool = False):
+        self.root = os.path.abspath(root)
+        self.hash_len = hash_len
+        self.gzip_level = gzip_level
+        self.auto_reload = auto_reload
+        self._assets: dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, filename: str) -> str | None:
+        if filename.endswith(".gz"):
+            return None
+        path = os.path.abspath(os.path.join(self.root, filename))
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+    def get(self, filename: str) -> Asset | None:
+        asset = self._assets.get(filename)
+        if asset is not None and not self.auto_reload:
+            return asset
+        path = self._resolve(filename)
+        if path is None:
+            return None
+        if asset is not None and os.path.getmtime(path) == asset.mtime:
+            return asset
+        fresh = Asset(path, self.hash_len, self.gzip_level)
+        with self._lock:
+            self._assets[filename] = fresh
+        return fresh
+
+    def build(self) -> list[str]:
+        """
+        Escribe `<archivo>.gz` al lado de cada css/js/svg de static/ (los
+        usa Asset en vez de comprimir al arrancar, y también nginx con
+        gzip_static). Devuelve los paths escritos.
+        """
+        written = []
+        for dirpath, _dirs, files in os.walk(self.root):
+            for name in sorted(files):
+                if name.endswith(".gz"):
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+                asset = self.get(rel)
+                if asset is None or asset.gz is None:
+                    continue
+                with open(asset.path + ".gz", "wb") as f:
+                    f.write(gzip.compress(asset.body, self.gzip_level, mtime=0))
+                written.append(asset.path + ".gz")
+        return written
+
+
+def accepts_gzip() -> bool:
+    return request.accept_encodings.quality("gzip") > 0
+
+
+def asset_url(filename: str) -> str:
+    """
+    URL con hash de contenido para un archivo de static/ (para usar en
+    templates: {{ asset_url('js/cases/detail.js') }}). Si el archivo no
+    existe cae en url_for('static') para que el error se vea en el 404.
+    """
+    store: AssetStore = current_app.extensions["assets"]
+    asset = store.get(filename)
+    if asset is None:
+        return url_for("static", filename=filename)
+    return url_for("assets", filename=hashed_name(filename, asset.digest))
+
+
+def init_assets(app):
+    """
+    - GET {ASSETS_URL_PREFIX}/<nombre.hash.ext>: sirve static/ con cache
+      inmutable de un año (el hash cambia cuando cambia el contenido) y
+      gzip precomprimido si el cliente lo acepta.
+    - asset_url() como global de Jinja.
+    - gzip al vuelo de respuestas de texto (HTML, JSON) desde GZIP_MIN_SIZE;
+      no toca streaming (SSE, passthrough) ni respuestas con ETag.
+    - `flask assets-build` genera las variantes .gz en disco.
+    """
+    store = AssetStore(
+        app.static_folder,
+        hash_len=app.config.get("ASSETS_HASH_LEN", 10),
+        gzip_level=app.config.get("ASSETS_GZIP_LEVEL", 9),
+        auto_reload=app.config.get("ASSETS_AUTO_RELOAD", False) or app.debug,
+    )
+    app.extensions["assets"] = store
+    app.add_template_global(asset_url, "asset_url")
+    max_age = app.config.get("ASSETS_MAX_AGE", 31536000)
+
+    def assets_view(filename):
+        logical, digest = split_hashed(filename, store.hash_len)
+        asset = store.get(logical)
+        if asset is None:
+            abort(404)
+        if digest == asset.digest:
+            cache_control = f"public, max-age={max_age}, immutable"
+        else:
+            # HTML viejo pidiendo otro hash (deploy en curso): se sirve el actual sin cachear
+            cache_control = "no-cache"
+        if asset.gz is not None and accepts_gzip():
+            resp = Response(asset.gz, mimetype=asset.mimetype)
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            resp = Response(asset.body, mimetype=asset.mimetype)
+        resp.headers["Cache-Control"] = cache_control
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+    app.add_url_rule(f"{app.config.get('ASSETS_URL_PREFIX', '/assets')}/<path:filename>", "assets", assets_view)
+
+    @app.cli.command("assets-build")
+    def assets_build():
+        """Precomprime css/js/svg de static/ (.gz al lado de cada archivo)."""
+        for path in store.build():
+            print(os.path.relpath(path, app.root_path))
+
+    if app.config.get("GZIP_ENABLED", True):
+        min_size = app.config.get("GZIP_MIN_SIZE", 1024)
+        level = app.config.get("GZIP_LEVEL", 6)
+
+        @app.after_request
+        def _gzip_response(response):
+            if (response.direct_passthrough or response.is_streamed
+                    or not 200 <= response.status_code < 300 or response.status_code == 204
+                    or "Content-Encoding" in response.headers or "ETag" in response.headers
+                    or response.mimetype not in COMPRESSIBLE or not accepts_gzip()):
+                return response
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+            response.set_data(gzip.compress(body, level))
+            response.headers["Content-Encoding"] = "gzip"
+            response.vary.add("Accept-Encoding")
+            return response
@@ -0,0 +1,331 @@
+# app/utils/cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .logs import get_logger
+
+log = get_logger("cache")
+
+# Centinelas de lookup
+MISSING = object()
+
+
+class _Negative:
+    """Marca un lookup que falló hace poco (negative caching)."""
+    def __repr__(self):
+        return "NEGATIVE"
+
+NEGATIVE = _Negative()
+
+
+class SQLiteStore:
+    """
+    Backing store compartido entre procesos del mismo host (workers de
+    gunicorn, reinicios). Guarda valores JSON con su vencimiento.
+
+    - WAL para que varios procesos lean mientras uno escribe.
+    - Una conexión por thread (sqlite3 no comparte conexiones entre threads).
+    - Acotado: cada `purge_every` escrituras borra vencidos y recorta a `maxsize` por namespace.
+    """
+
+    def __init__(self, path: str, maxsize: int = 50_000, purge_every: int = 500):
+        self.path = path
+        self.maxsize = maxsize
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        with self._conn() as c:
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT,"
+                " negative INTEGER NOT NULL DEFAULT 0,"
+                " expires_at REAL NOT NULL, stored_at REAL NOT NULL,"
+                " PRIMARY KEY (ns, key))"
+            )
+            c.execute("CREATE INDEX IF NOT EXISTS cache_exp ON cache (ns, expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        c = getattr(self._local, "conn", None)
+        if c is None:
+            c = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = c
+        return c
+
+    def get(self, ns: str, key: str):
+        """Devuelve (value, negative, expires_at) o None si no está o venció."""
+        row = self._conn().execute(
+            "SELECT value, negative, expires_at FROM cache WHERE ns=? AND key=? AND expires_at>?",
+            (ns, key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        value, negative, expires_at = row
+        return (None if negative else json.loads(value)), bool(negative), expires_at
+
+    def set(self, ns: str, key: str, value, expires_at: float, negative: bool = False):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (ns, key, value, negative, expires_at, stored_at) VALUES (?,?,?,?,?,?)",
+            (ns, key, None if negative else json.dumps(value), int(negative), expires_at, now),
+        )
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self.purge(ns)
+
+    def items(self, ns: str) -> dict:
+        """Todos los valores vigentes (no negativos) del namespace: {key: value}."""
+        rows = self._conn().execute(
+            "SELECT key, value FROM cache WHERE ns=? AND negative=0 AND expires_at>?",
+            (ns, time.time()),
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def delete(self, ns: str, key: str):
+        self._conn().execute("DELETE FROM cache WHERE ns=? AND key=?", (ns, key))
+
+    def clear(self, ns: str):
+        self._conn().execute("DELETE FROM cache WHERE ns=?", (ns,))
+
+    def purge(self, ns: str):
+        c = self._conn()
+        c.execute("DELETE FROM cache WHERE ns=? AND expires_at<=?", (ns, time.time()))
+        c.execute(
+            "DELETE FROM cache WHERE ns=? AND key IN ("
+            " SELECT key FROM cache WHERE ns=? ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (ns, ns, self.maxsize),
+        )
+
+
+class TTLCache:
+    """
+    Caché LRU acotada con TTL, negative caching y contadores.
+
+    - `maxsize` entradas en memoria; al pasarse se desaloja la menos usada.
+    - `ttl` para valores, `negative_ttl` para lookups fallidos (`set_negative`).
+    - `store` opcional (SQLiteStore) compartido entre procesos: se consulta en
+      un miss local y se escribe en cada set (write-through).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, negative_ttl: float = 30,
+                 store: SQLiteStore | None = None, namespace: str = "default"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.store = store
+        self.namespace = namespace
+        self._data: OrderedDict = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.store_hits = 0
+        self.store_errors = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not MISSING
+
+    def get(self, key, default=MISSING):
+        """
+        Devuelve el valor, NEGATIVE si el último lookup falló, o `default`
+        (MISSING) si no está o venció.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    if value is NEGATIVE:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+
+        stored = self._store_get(key)
+        if stored is not None:
+            value, negative, expires_at = stored
+            value = NEGATIVE if negative else value
+            with self._lock:
+                self._put(key, value, expires_at)
+                self.store_hits += 1
+                if negative:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._put(key, value, expires_at)
+        self._store_set(key, value, expires_at, negative=False)
+
+    def set_negative(self, key, ttl: float | None = None):
+        expires_at = time.time() + (self.negative_ttl if ttl is None else ttl)
+        with self._lock:
+            self._put(key, NEGATIVE, expires_at)
+        self._store_set(key, None, expires_at, negative=True)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.store is not None:
+            try:
+                self.store.delete(self.namespace, str(key))
+            except sqlite3.Error:
+                self.store_errors += 1
+
+    def delete_where(self, predicate) -> int:
+        """
+        Borra de memoria las entradas cuya key cumple `predicate(key)`.
+        (No toca el backing store: pensado para cachés solo en memoria.)
+        """
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def values(self) -> list:
+        """
+        Valores vigentes en memoria (sin consultar el store ni tocar contadores/LRU).
+        """
+        now = time.time()
+        with self._lock:
+            return [v for v, exp in self._data.values() if exp > now and v is not NEGATIVE]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        if self.store is not None:
+            try:
+                self.store.clear(self.namespace)
+            except sqlite3.Error:
+                self.store_errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "store_hits": self.store_hits,
+                "store_errors": self.store_errors,
+                "hit_rate": ((self.hits + self.negative_hits) / lookups) if lookups else 0.0,
+            }
+
+    # --- internos (llamar con _lock tomado) ---
+
+    def _put(self, key, value, expires_at):
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    # --- backing store (errores del store nunca rompen la request) ---
+
+    def _store_get(self, key):
+        if self.store is None:
+            return None
+        try:
+            return self.store.get(self.namespace, str(key))
+        except (sqlite3.Error, ValueError):
+            self.store_errors += 1
+            return None
+
+    def _store_set(self, key, value, expires_at, negative):
+        if self.store is None:
+            return
+        try:
+            self.store.set(self.namespace, str(key), value, expires_at, negative=negative)
+        except (sqlite3.Error, TypeError, ValueError):
+            self.store_errors += 1
+
+
+_STORES: dict[str, SQLiteStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def shared_store(path: str | None) -> SQLiteStore | None:
+    """
+    Devuelve el SQLiteStore del proceso para `path` (uno por archivo), o None
+    si no hay path configurado o no se puede abrir.
+    """
+    if not path:
+        return None
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            try:
+                store = SQLiteStore(path)
+            except (sqlite3.Error, OSError) as e:
+                log.warning("No se pudo abrir el store %s: %s", path, e)
+                return None
+            _STORES[path] = store
+        return store
+
+
+class SingleFlight:
+    """
+    Coalesce llamadas idénticas en vuelo: mientras haya una llamada para `key`
+    sin terminar, los demás pedidos reciben el mismo Future en vez de
+    disparar otra llamada al backend.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def do(self, key, start):
+        """
+        `start()` debe lanzar la llamada y devolver un concurrent.futures.Future.
+        Devuelve (future, leader): leader=True si este pedido disparó la llamada.
+        """
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut, False
+            fut = start()
+            self._calls[key] = fut
+            self.started += 1
+
+        def _forget(_f, key=key):
+            with self._lock:
+                if self._calls.get(key) is _f:
+                    del self._calls[key]
+
+        fut.add_done_callback(_forget)
+        return fut, True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "started": self.started, "coalesced": self.coalesced}
@@ -0,0 +1,271 @@
+# app/utils/config_cache.py
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import current_app, request
+from werkzeug.http import unquote_etag
+
+from .api import get, executor, in_app_context
+from .cache import TTLCache, MISSING, SQLiteStore, shared_store
+from .logs import get_logger
+from .metrics import register_collector
+
+log = get_logger("config_cache")
+
+
+class CachedResponse:
+    """
+    Respuesta del backend guardada en la caché de config.
+    """
+    __slots__ = ("body", "status", "content_type", "etag", "fetched_at")
+
+    def __init__(self, body: bytes, status: int, content_type: str, etag: str, fetched_at: float):
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+        self.etag = etag
+        self.fetched_at = fetched_at
+
+
+def token_scope(headers: dict | None) -> str:
+    """
+    Scope de caché derivado del Authorization (nunca se guarda el token en claro).
+    Cada token/tenant ve solo sus propias entradas.
+    """
+    auth = (headers or {}).get("Authorization") or ""
+    if not auth:
+        return "anon"
+    return hashlib.sha256(auth.encode()).hexdigest()[:16]
+
+
+def _body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+class ConfigCache:
+    """
+    Caché stale-while-revalidate para los GET de config (/api/config/*).
+
+    - Entrada fresca (edad < fresh_ttl): se sirve sin ir al backend.
+    - Entrada stale (edad < fresh_ttl + stale_ttl): se sirve igual y se
+      revalida en background con If-None-Match (un solo refresh por key).
+    - Más vieja o inexistente: fetch sincrónico (con If-None-Match si hay ETag).
+    - Las escrituras llaman a invalidate(prefix) y el próximo GET va al backend,
+      también en los otros workers: la invalidación se marca en el SQLiteStore
+      compartido (`store`) y cada proceso la lee como mucho cada `sync_interval`.
+
+    `version(prefix, scope)` cambia cada vez que el contenido de ese path
+    cambia para ese scope o se invalida; sirve para armar keys de cachés que
+    dependen de la config.
+    """
+
+    _MARKS_NS = "config_invalidations"
+
+    def __init__(self, fresh_ttl: float = 60, stale_ttl: float = 600, maxsize: int = 2048,
+                 store: SQLiteStore | None = None, sync_interval: float = 0.2):
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self._entries = TTLCache(maxsize=maxsize, ttl=fresh_ttl + stale_ttl, namespace="config")
+        self._refreshing: set = set()
+        self._versions: dict[tuple, int] = {}      # (scope, path) -> contador
+        self._body_hashes: dict[tuple, str] = {}   # (scope, path) -> etag
+        self._marks: dict[str, float] = {}         # prefix -> última invalidación (cualquier proceso)
+        self._lock = threading.Lock()
+        self._generation = 0  # sube en cada invalidate: descarta fetches que quedaron viejos
+        self.store = store
+        self.sync_interval = sync_interval
+        self._synced_at = 0.0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.remote_invalidations = 0
+
+    # --- lectura ---
+
+    def fetch(self, path: str, headers: dict) -> CachedResponse:
+        self._sync_marks()
+        key = (token_scope(headers), path)
+        entry = self._entries.get(key)
+
+        # Anterior a una invalidación (de este u otro worker): como si no estuviera
+        if entry is not MISSING and entry.fetched_at < self._mark_for(path):
+            entry = MISSING
+
+        if entry is not MISSING:
+            age = time.time() - entry.fetched_at
+            if age < self.fresh_ttl:
+                return entry
+            self._schedule_refresh(key, path, headers, entry)
+            return entry
+
+        return self._load(key, path, headers, previous=None)
+
+    def _load(self, key, path: str, headers: dict, previous: CachedResponse | None) -> CachedResponse:
+        generation = self._generation
+        started = time.time()  # la edad cuenta desde que se pidió: un write en el medio la invalida
+        h = dict(headers or {})
+        if previous is not None and previous.etag:
+            h["If-None-Match"] = previous.etag
+
+        r = get(path, headers=h)
+
+        if r.status_code == 304 and previous is not None:
+            with self._lock:
+                self.not_modified += 1
+            entry = CachedResponse(previous.body, previous.status, previous.content_type,
+                                   previous.etag, started)
+            if generation == self._generation:
+                self._entries.set(key, entry)
+            return entry
+
+        body = r.content or b""
+        entry = CachedResponse(
+            body=body,
+            status=r.status_code,
+            content_type=r.headers.get("Content-Type", "application/json"),
+            etag=r.headers.get("ETag") or _body_etag(body),
+            fetched_at=started,
+        )
+        # Solo cacheamos respuestas OK; los errores pasan directo
+        if r.status_code == 200 and generation == self._generation:
+            self._entries.set(key, entry)
+            self._track_version(key, entry.etag)
+        return entry
+
+    def _schedule_refresh(self, key, path: str, headers: dict, previous: CachedResponse):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.revalidations += 1
+
+        def refresh():
+            try:
+                self._load(key, path, headers, previous)
+            except Exception as e:
+                log.warning("Error revalidando %s: %s", path, e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        executor().submit(in_app_context(refresh))
+
+    # --- invalidación / versión ---
+
+    def invalidate(self, prefix: str):
+        """
+        Borra todas las entradas (de todos los scopes) cuyo path empieza con
+        `prefix`, acá y —vía el store compartido— en los demás workers.
+        """
+        now = time.time()
+        self._invalidate_local(prefix, now)
+        if self.store is not None:
+            try:
+                self.store.set(self._MARKS_NS, prefix, now,
+                               expires_at=now + self.fresh_ttl + self.stale_ttl + 60)
+            except sqlite3.Error as e:
+                log.warning("No se pudo propagar la invalidación de %s: %s", prefix, e)
+
+    def _invalidate_local(self, prefix: str, at: float):
+        self._entries.delete_where(lambda k: k[1].startswith(prefix))
+        with self._lock:
+            self._generation += 1
+            for key in list(self._body_hashes):
+                if key[1].startswith(prefix):
+                    del self._body_hashes[key]
+            self._marks[prefix] = max(at, self._marks.get(prefix, 0.0))
+
+    def _sync_marks(self):
+        """Aplica las invalidaciones hechas por otros workers (como mucho cada sync_interval)."""
+        if self.store is None or time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = time.monotonic()
+        try:
+            marks = self.store.items(self._MARKS_NS)
+        except sqlite3.Error as e:
+            log.warning("No se pudieron leer invalidaciones compartidas: %s", e)
+            return
+        for prefix, at in marks.items():
+            if at > self._marks.get(prefix, 0.0):
+                self.remote_invalidations += 1
+                self._invalidate_local(prefix, at)
+
+    def _mark_for(self, path: str) -> float:
+        with self._lock:
+            return max((at for p, at in self._marks.items() if path.startswith(p)), default=0.0)
+
+    def _track_version(self, key: tuple, etag: str):
+        with self._lock:
+            if self._body_hashes.get(key) != etag:
+                self._body_hashes[key] = etag
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def version(self, prefix: str, scope: str) -> str:
+        """
+        Versión opaca de todo lo que cuelga de `prefix` para un scope: cambia
+        si cambió el contenido que vio ese scope o si hubo una invalidación.
+        """
+        self._sync_marks()
+        with self._lock:
+            parts = sorted(
+                [(p, v) for (sc, p), v in self._versions.items()
+                 if sc == scope and (p.startswith(prefix) or prefix.startswith(p))]
+                + [(p, at) for p, at in self._marks.items()
+                   if p.startswith(prefix) or prefix.startswith(p)]
+            )
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+
+    def stats(self) -> dict:
+        st = self._entries.stats()
+        st.update(revalidations=self.revalidations, not_modified=self.not_modified,
+                  remote_invalidations=self.remote_invalidations)
+        return st
+
+
+_CONFIG_CACHE: ConfigCache | None = None
+_CONFIG_CACHE_LOCK = threading.Lock()
+
+
+def config_cache() -> ConfigCache:
+    """
+    Caché de config del proceso; se crea la primera vez con la config de la app.
+    """
+    global _CONFIG_CACHE
+    if _CONFIG_CACHE is None:
+        with _CONFIG_CACHE_LOCK:
+            if _CONFIG_CACHE is None:
+                cfg = current_app.config
+                # Las invalidaciones siempre se comparten entre los workers del
+                # host: sin CACHE_DB_PATH se usa un archivo en el tmp del sistema
+                store_path = cfg.get("CACHE_DB_PATH") or os.path.join(tempfile.gettempdir(), "selva-config-cache.db")
+                _CONFIG_CACHE = ConfigCache(
+                    fresh_ttl=cfg.get("CONFIG_CACHE_TTL", 60),
+                    stale_ttl=cfg.get("CONFIG_CACHE_STALE_TTL", 600),
+                    maxsize=cfg.get("CONFIG_CACHE_MAXSIZE", 2048),
+                    store=shared_store(store_path),
+                    sync_interval=cfg.get("CONFIG_INVALIDATION_SYNC", 0.2),
+                )
+    return _CONFIG_CACHE
+
+
+register_collector("config", lambda: _CONFIG_CACHE.stats() if _CONFIG_CACHE else None)
+
+
+def cached_config_response(path: str, headers: dict):
+    """
+    Respuesta Flask para un GET de config pasando por la caché.
+    Responde 304 si el browser ya tiene esa versión (If-None-Match).
+    """
+    entry = config_cache().fetch(path, headers)
+    resp_headers = {"Content-Type": entry.content_type}
+    if entry.status == 200:
+        resp_headers["ETag"] = entry.etag
+        # privada (depende del JWT) y siempre revalidada contra nosotros
+        resp_headers["Cache-Control"] = "private, no-cache"
+        tag, _weak = unquote_etag(entry.etag)
+        if tag and request.if_none_match.contains_weak(tag):
+            return ("", 304, resp_headers)
+    return (entry.body, entry.status, resp_headers)
@@ -0,0 +1,154 @@
+# app/utils/customer_index.py
+import threading
+import time
+from bisect import bisect_left, insort
+
+from .cache import TTLCache, MISSING
+
+
+def normalize_phone(phone) -> str:
+    """'+595 981-514 767' -> '595981514767' (solo dígitos, con código de país)."""
+    return "".join(ch for ch in str(phone or "") if ch.isdigit())
+
+
+class PhoneIndex:
+    """
+    Índice local de clientes por teléfono normalizado: array ordenado de
+    teléfonos (bisect) + dict teléfono -> cliente. Responde exacto y por
+    prefijo sin ir al backend.
+
+    - Se llena con lo que devuelven los lookups y los creates.
+    - Cada entrada recuerda cuándo se vio; pasado `ttl` deja de servirse
+      sola y se confirma contra el backend (que la vuelve a cargar).
+    - Acotado a `maxsize` teléfonos: al pasarse se descarta el 10% más viejo.
+    """
+
+    def __init__(self, maxsize: int = 50_000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._keys: list[str] = []          # teléfonos ordenados
+        self._entries: dict = {}            # teléfono -> (cliente, seen_at)
+        self._by_id: dict = {}              # id de cliente -> teléfono
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, customer: dict) -> bool:
+        """Indexa (o refresca) un cliente del backend. False si no tiene teléfono."""
+        if not isinstance(customer, dict):
+            return False
+        key = normalize_phone(customer.get("phone"))
+        if not key:
+            return False
+        cid = customer.get("id")
+        now = time.time()
+        with self._lock:
+            # Si el cliente cambió de teléfono, sale la entrada vieja
+            old = self._by_id.get(cid) if cid is not None else None
+            if old is not None and old != key:
+                self._remove(old)
+            if key not in self._entries:
+                insort(self._keys, key)
+            self._entries[key] = (customer, now)
+            if cid is not None:
+                self._by_id[cid] = key
+            if len(self._keys) > self.maxsize:
+                self._evict()
+        return True
+
+    def add_many(self, customers) -> int:
+        return sum(1 for c in customers or () if self.add(c))
+
+    def exact(self, phone) -> dict | None:
+        """Cliente con ese teléfono si está y no venció; None si hay que ir al backend."""
+        key = normalize_phone(phone)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry[1] > self.ttl:
+                self.stale += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def prefix(self, phone, limit: int = 10) -> list[dict]:
+        """Hasta `limit` clientes (no vencidos) cuyo teléfono empieza con `phone`."""
+        key = normalize_phone(phone)
+        out = []
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and len(out) < limit and self._keys[i].startswith(key):
+                customer, seen_at = self._entries[self._keys[i]]
+                if seen_at >= cutoff:
+                    out.append(customer)
+                i += 1
+            if out:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "size": len(self._keys),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+    # --- internos (llamar con _lock tomado) ---
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+        cid = entry[0].get("id")
+        if self._by_id.get(cid) == key:
+            del self._by_id[cid]
+
+    def _evict(self):
+        oldest = sorted(self._entries, key=lambda k: self._entries[k][1])
+        for key in oldest[: max(1, self.maxsize // 10)]:
+            self._remove(key)
+
+
+class PhoneIndexStore:
+    """
+    Un índice por scope (token): cada tenant ve solo sus clientes. Acotado (LRU).
+    """
+
+    def __init__(self, max_scopes: int = 100, maxsize: int = 50_000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._indexes = TTLCache(maxsize=max_scopes, ttl=float("inf"), namespace="customer_index")
+        self._lock = threading.Lock()
+
+    def get(self, scope: str) -> PhoneIndex:
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is MISSING:
+                index = PhoneIndex(self.maxsize, self.ttl)
+                self._indexes.set(scope, index)
+            return index
+
+    def stats(self) -> dict:
+        indexes = self._indexes.values()
+        totals = {"scopes": len(indexes), "size": 0, "hits": 0, "misses": 0, "stale": 0}
+        for index in indexes:
+            st = index.stats()
+            for k in ("size", "hits", "misses", "stale"):
+                totals[k] += st[k]
+        return totals
@@ -0,0 +1,119 @@
+# app/utils/formatting.py
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import pytz
+from flask import current_app, has_app_context
+
+from ..config import AppConfig
+
+# Tamaño de los memos: los listados repiten mucho los mismos timestamps
+_MEMO_SIZE = 16384
+
+# Spec de format() por cantidad de decimales; "_" como separador de miles
+# evita el paso intermedio por "X" al intercambiar "," y "."
+_NUM_SPECS = {d: f"_.{d}f" for d in range(7)}
+
+
+def default_tz_name() -> str:
+    """
+    Zona horaria configurada (AppConfig.TZ o la de la app si hay contexto).
+    """
+    if has_app_context():
+        return current_app.config.get("TZ") or AppConfig.TZ
+    return AppConfig.TZ
+
+
+@lru_cache(maxsize=32)
+def get_tz(name: str | None = None):
+    """
+    Objeto tz cacheado; no se vuelve a construir en cada conversión.
+    """
+    return pytz.timezone(name or AppConfig.TZ)
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def parse_iso(iso_ts: str | None) -> datetime | None:
+    """
+    Parsea '2025-11-06T12:34:56Z', '...+00:00' o '2025-11-06 12:34:56'
+    (sin tz se asume UTC). Devuelve None si no se puede.
+    """
+    if not iso_ts:
+        return None
+    try:
+        dt = datetime.fromisoformat(iso_ts.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _format_ts(iso_ts, fmt: str, tz_name: str, default):
+    dt = parse_iso(iso_ts)
+    if dt is None:
+        return default
+    return dt.astimezone(get_tz(tz_name)).strftime(fmt)
+
+
+def format_ts(iso_ts: str | None, fmt: str = "%Y-%m-%d %H:%M", tz_name: str | None = None, default=None) -> str:
+    """
+    ISO (UTC u offset) -> texto en la zona configurada. Memoizado por
+    (valor, formato, zona): un timestamp repetido se convierte una sola vez.
+    Si no se puede parsear devuelve `default` (o el valor original si es None).
+    """
+    if not isinstance(iso_ts, str):
+        iso_ts = str(iso_ts) if iso_ts is not None else ""
+    out = _format_ts(iso_ts, fmt, tz_name or default_tz_name(), default)
+    return iso_ts if out is None else out
+
+
+def format_column(rows: list, src, dest: str, fmt: str = "%d/%m/%Y", tz_name: str | None = None, default=None) -> list:
+    """
+    Formatea una columna completa: lee la primera clave no vacía de `src`
+    (str o tupla de claves) en cada fila y escribe el resultado en `dest`.
+    Cada valor distinto se convierte una sola vez. Modifica y devuelve `rows`.
+    """
+    keys = (src,) if isinstance(src, str) else tuple(src)
+    tz_name = tz_name or default_tz_name()
+    done: dict = {}
+    for row in rows:
+        val = ""
+        for k in keys:
+            val = row.get(k)
+            if val not in (None, ""):
+                break
+        val = val or ""
+        out = done.get(val)
+        if out is None:
+            out = _format_ts(val, fmt, tz_name, default)
+            if out is None:
+                out = val
+            done[val] = out
+        row[dest] = out
+    return rows
+
+
+def numfmt(value, decimals=0):
+    """
+    Formatea números con formato latam:
+    - 8837.24  -> 8.837,24
+    - 705000   -> 705.000
+    """
+    try:
+        n = float(value)
+    except (TypeError, ValueError):
+        return value
+    spec = _NUM_SPECS.get(decimals) or f"_.{decimals}f"
+    s = format(n, spec)
+    if decimals == 0:
+        return s.replace("_", ".")
+    return s.replace(".", ",").replace("_", ".")
+
+
+def cache_info() -> dict:
+    return {
+        "parse_iso": parse_iso.cache_info()._asdict(),
+        "format_ts": _format_ts.cache_info()._asdict(),
+    }
@@ -0,0 +1,82 @@
+# app/utils/fragments.py
+import hashlib
+import json
+import threading
+
+from flask import current_app, render_template
+from markupsafe import Markup
+
+from .cache import TTLCache, MISSING
+from .metrics import register_collector
+
+# Caché de fragmentos renderizados (HTML) por contenido
+_FRAGMENTS: TTLCache | None = None
+_FRAGMENTS_LOCK = threading.Lock()
+
+# Versión de cada template: si Jinja lo recarga (cambió el archivo) cambia el
+# objeto Template y se recalcula el hash de su fuente
+_TEMPLATE_VERSIONS: dict = {}   # nombre -> (Template, hash de la fuente)
+
+
+def fragment_cache() -> TTLCache:
+    """
+    Caché de fragmentos del proceso; se crea la primera vez con la config de la app.
+    """
+    global _FRAGMENTS
+    if _FRAGMENTS is None:
+        with _FRAGMENTS_LOCK:
+            if _FRAGMENTS is None:
+                cfg = current_app.config
+                _FRAGMENTS = TTLCache(
+                    maxsize=cfg.get("FRAGMENT_CACHE_MAXSIZE", 500),
+                    ttl=cfg.get("FRAGMENT_CACHE_TTL", 3600),
+                    namespace="fragments",
+                )
+    return _FRAGMENTS
+
+register_collector("fragments", lambda: _FRAGMENTS.stats() if _FRAGMENTS else None)
+
+
+def content_hash(data) -> str:
+    """
+    Hash estable de los datos de entrada de un fragmento (dicts/listas de
+    valores simples, como las filas normalizadas de casos).
+    """
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _template_version(name: str):
+    tpl = current_app.jinja_env.get_template(name)
+    known = _TEMPLATE_VERSIONS.get(name)
+    if known is not None and known[0] is tpl:
+        return tpl, known[1]
+    source = current_app.jinja_env.loader.get_source(current_app.jinja_env, name)[0]
+    version = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+    _TEMPLATE_VERSIONS[name] = (tpl, version)
+    return tpl, version
+
+
+def render_fragment(template_name: str, **context) -> Markup:
+    """
+    Renderiza un template parcial cacheando el HTML por (template, hash del
+    contexto). Mismos datos -> mismo HTML, así que los grupos/páginas que no
+    cambiaron entre requests no se vuelven a renderizar. El contexto tiene
+    que ser todo lo que el parcial usa (no debe leer request/g/session).
+
+    Disponible en Jinja: {{ render_fragment("dashboard/_rows.html", lista=lista) }}
+    """
+    cfg = current_app.config
+    if not cfg.get("FRAGMENT_CACHE_ENABLED", True):
+        return Markup(render_template(template_name, **context))
+
+    tpl, version = _template_version(template_name)
+    key = (template_name, version, content_hash(context))
+    cache = fragment_cache()
+    html = cache.get(key)
+    if html is MISSING:
+        html = Markup(render_template(tpl, **context))
+        # Fragmentos gigantes no se guardan: la memoria queda acotada a maxsize * max_bytes
+        if len(html) <= cfg.get("FRAGMENT_CACHE_MAX_BYTES", 256 * 1024):
+            cache.set(key, html)
+    return html
@@ -0,0 +1,222 @@
+# app/utils/logs.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+
+from ..config import AppConfig
+
+ROOT = "selva"
+
+_LISTENER: logging.handlers.QueueListener | None = None
+_SAMPLER: "RouteSampler | None" = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger hijo de "selva" (p.ej. get_logger("dashboard") -> selva.dashboard).
+    """
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+def _cfg(name: str, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return getattr(AppConfig, name, default)
+
+
+def truncate(body, limit: int | None = None) -> str:
+    """
+    Recorta un body (str/bytes/objeto) a `limit` caracteres (LOG_BODY_MAX por defecto).
+    """
+    if limit is None:
+        limit = _cfg("LOG_BODY_MAX", 500)
+    if isinstance(body, bytes):
+        body = body[:limit * 4].decode("utf-8", errors="replace")
+    elif not isinstance(body, str):
+        try:
+            body = json.dumps(body, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            body = repr(body)
+    if len(body) <= limit:
+        return body
+    return f"{body[:limit]}… (+{len(body) - limit} chars)"
+
+
+def payloads_enabled(logger: logging.Logger) -> bool:
+    """
+    ¿Se vuelcan payloads completos? Solo con LOG_PAYLOADS=1 y nivel DEBUG activo.
+    """
+    return bool(_cfg("LOG_PAYLOADS", False)) and logger.isEnabledFor(logging.DEBUG)
+
+
+def debug_payload(logger: logging.Logger, label: str, payload):
+    """
+    Vuelca un payload (truncado) en DEBUG si LOG_PAYLOADS está activo.
+    No serializa nada si está apagado.
+    """
+    if payloads_enabled(logger):
+        logger.debug("%s: %s", label, truncate(payload))
+
+
+# ===============================
+# Muestreo por ruta
+# ===============================
+def _parse_rates(raw: str) -> dict:
+    # "dashboard.index=0.1,cases.quote=0.05"
+    rates = {}
+    for part in (raw or "").split(","):
+        name, _, val = part.partition("=")
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(val)))
+        except ValueError:
+            continue
+    return rates
+
+
+class RouteSampler(logging.Filter):
+    """
+    Deja pasar DEBUG/INFO solo en una fracción de las requests de cada
+    endpoint (LOG_SAMPLE_RATES / LOG_SAMPLE_DEFAULT). La decisión se toma
+    una vez por request, así se ven requests completas y no líneas sueltas.
+    WARNING en adelante y lo que pasa fuera de una request no se muestrea.
+    """
+
+    def __init__(self, rates: dict | None = None, default: float = 1.0):
+        super().__init__()
+        self.rates = rates or {}
+        self.default = default
+
+    def rate(self, endpoint: str) -> float:
+        # "cases.quote" o, si no está, el blueprint entero ("cases")
+        return self.rates.get(endpoint, self.rates.get(endpoint.split(".")[0], self.default))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not has_request_context():
+            return True
+        sampled = getattr(g, "_log_sampled", None)
+        if sampled is None:
+            rate = self.rate(request.endpoint or "")
+            sampled = g._log_sampled = rate >= 1.0 or random.random() < rate
+        return sampled
+
+
+# ===============================
+# Formato
+# ===============================
+class RequestContextFilter(logging.Filter):
+    """
+    Agrega método/ruta/endpoint al record. Corre en el thread de la request
+    (antes de encolar), porque el listener no tiene contexto de Flask.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+            record.endpoint = request.endpoint or ""
+        else:
+            record.method = record.path = record.endpoint = ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por evento."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for k in ("method", "path", "endpoint"):
+            v = getattr(record, k, "")
+            if v:
+                out[k] = v
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+_TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(method)s %(path)s] %(message)s"
+
+
+def setup_logging(app):
+    """
+    Configura el logger "selva":
+    - Nivel LOG_LEVEL; formato texto o JSON (LOG_JSON).
+    - QueueHandler: la request solo encola el record; un QueueListener
+      (thread propio) formatea y escribe a stderr.
+    - Muestreo por endpoint para DEBUG/INFO.
+    Idempotente: si ya hay un listener corriendo se reutiliza.
+    """
+    global _LISTENER, _SAMPLER
+    cfg = app.config
+    logger = logging.getLogger(ROOT)
+    logger.setLevel(str(cfg.get("LOG_LEVEL", "INFO")).upper())
+    logger.propagate = False
+
+    if _LISTENER is None:
+        stream = logging.StreamHandler(sys.stderr)
+        if cfg.get("LOG_JSON"):
+            stream.setFormatter(JsonFormatter())
+        else:
+            stream.setFormatter(logging.Formatter(_TEXT_FORMAT))
+
+        q: queue.Queue = queue.Queue(maxsize=cfg.get("LOG_QUEUE_SIZE", 10000))
+        _LISTENER = logging.handlers.QueueListener(q, stream, respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(_LISTENER.stop)
+
+        _SAMPLER = RouteSampler()
+        handler = _DroppingQueueHandler(q)
+        handler.addFilter(_SAMPLER)
+        handler.addFilter(RequestContextFilter())
+        logger.handlers[:] = [handler]
+
+    _SAMPLER.rates = _parse_rates(cfg.get("LOG_SAMPLE_RATES", ""))
+    _SAMPLER.default = float(cfg.get("LOG_SAMPLE_DEFAULT", 1.0))
+
+    return logger
+
+
+def _restart_listener_after_fork():
+    """
+    En un worker forkeado (gunicorn con preload_app) el thread del listener
+    no existe: sin esto los records se encolan y nunca se escriben. Se crea
+    una cola nueva (el lock de la vieja pudo quedar tomado en el fork) y se
+    vuelve a arrancar el listener.
+    """
+    if _LISTENER is None:
+        return
+    q: queue.Queue = queue.Queue(maxsize=_LISTENER.queue.maxsize)
+    for handler in logging.getLogger(ROOT).handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            handler.queue = q
+    _LISTENER.queue = q
+    _LISTENER._thread = None
+    _LISTENER.start()
+
+
+if hasattr(os, "register_at_fork"):  # no existe en Windows
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Si la cola está llena se descarta el record en vez de bloquear la request.
+    """
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
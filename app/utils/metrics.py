@@ -0,0 +1,252 @@
+# app/utils/metrics.py
+import hmac
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+from .logs import get_logger
+
+# Buckets de latencia (segundos) y de tamaño (bytes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Segmentos variables de un path del backend -> {id}
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{24,})$")
+
+
+def path_template(path: str) -> str:
+    """
+    "/api/cases/123/attachments?x=1" -> "/api/cases/{id}/attachments".
+    Mantiene acotada la cardinalidad de las etiquetas.
+    """
+    path = path.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/"))
+
+
+def _label_str(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    parts = []
+    for n, v in zip(names, values):
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{n}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> list:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for lv, v in sorted(self._values.items()):
+                out.append(f"{self.name}{_label_str(self.labels, lv)} {v:g}")
+        return out
+
+
+class Histogram:
+    """
+    Histograma acumulativo al estilo Prometheus (buckets fijos + sum + count).
+    """
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: dict = {}   # labels -> [counts por bucket (+Inf al final), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            s[0][idx] += 1
+            s[1] += value
+
+    def render(self) -> list:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            series = [(lv, list(s[0]), s[1]) for lv, s in sorted(self._series.items())]
+        for lv, counts, total in series:
+            acc = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                acc += c
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                out.append(f"{self.name}_bucket{_label_str(names, lv + (le,))} {acc}")
+            out.append(f"{self.name}_sum{_label_str(self.labels, lv)} {total:.6f}")
+            out.append(f"{self.name}_count{_label_str(self.labels, lv)} {acc}")
+        return out
+
+
+class Registry:
+    """
+    Métricas del proceso. Con varios workers cada uno expone las suyas
+    (Prometheus las suma por instancia).
+    """
+
+    def __init__(self):
+        self.metrics: list = []
+        self.collectors: dict = {}   # nombre -> (callable que devuelve dict de stats o None, prefijo, label)
+
+    def counter(self, *args, **kwargs) -> Counter:
+        m = Counter(*args, **kwargs)
+        self.metrics.append(m)
+        return m
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        m = Histogram(*args, **kwargs)
+        self.metrics.append(m)
+        return m
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics:
+            lines.extend(m.render())
+        lines.extend(self._render_collectors())
+        return "\n".join(lines) + "\n"
+
+    def _render_collectors(self) -> list:
+        # Stats de cachés (TTLCache/SingleFlight/ConfigCache, etc.) como gauges
+        gauges: dict = {}
+        for source, (fn, prefix, label) in sorted(self.collectors.items()):
+            try:
+                st = fn()
+            except Exception:
+                continue
+            for key, val in (st or {}).items():
+                if isinstance(val, bool) or not isinstance(val, (int, float)):
+                    continue
+                gauges.setdefault(f"{prefix}_{key}", []).append((label, source, val))
+        out = []
+        for name, rows in sorted(gauges.items()):
+            out.append(f"# TYPE {name} gauge")
+            for label, source, val in rows:
+                out.append(f'{name}{{{label}="{source}"}} {val:g}')
+        return out
+
+
+REGISTRY = Registry()
+
+HTTP_DURATION = REGISTRY.histogram(
+    "selva_http_request_duration_seconds", "Duración de las requests por endpoint Flask",
+    ("endpoint", "method", "status"))
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    "selva_http_response_size_bytes", "Tamaño de respuesta por endpoint (si se conoce)",
+    ("endpoint",), SIZE_BUCKETS)
+HTTP_EXCEPTIONS = REGISTRY.counter(
+    "selva_http_exceptions_total", "Excepciones no manejadas por endpoint", ("endpoint",))
+
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "selva_upstream_request_duration_seconds", "Latencia de llamadas al backend por path",
+    ("method", "path", "status"))
+UPSTREAM_RESPONSE_SIZE = REGISTRY.histogram(
+    "selva_upstream_response_size_bytes", "Tamaño de respuesta del backend por path",
+    ("method", "path"), SIZE_BUCKETS)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "selva_upstream_errors_total", "Errores de llamadas al backend (timeout, connection, circuit_open, http_5xx, other)",
+    ("method", "path", "kind"))
+
+
+def register_collector(name: str, fn, prefix: str = "selva_cache", label: str = "cache"):
+    """
+    Registra una función que devuelve stats numéricas (p.ej. TTLCache.stats)
+    para exponerlas en /metrics como `<prefix>_<stat>{<label>="<name>"}`.
+    Si devuelve None se omite.
+    """
+    REGISTRY.collectors[name] = (fn, prefix, label)
+
+
+def error_kind(error) -> str:
+    if getattr(error, "metric_kind", None):
+        return error.metric_kind
+    name = type(error).__name__.lower()
+    if "timeout" in name:
+        return "timeout"
+    if "connect" in name:
+        return "connection"
+    return "other"
+
+
+def observe_upstream(method: str, path: str, started: float, status=None, error=None, size=None):
+    """
+    Registra una llamada al backend. `path` puede ser un path concreto o
+    una URL absoluta; se reduce a su template. `started` es perf_counter().
+    """
+    method = method.upper()
+    tpl = path_template(path) if path.startswith("/") else "external"
+    elapsed = time.perf_counter() - started
+    if error is not None:
+        UPSTREAM_ERRORS.inc(method, tpl, error_kind(error))
+        UPSTREAM_DURATION.observe(elapsed, method, tpl, "error")
+        return
+    UPSTREAM_DURATION.observe(elapsed, method, tpl, str(status))
+    if status is not None and status >= 500:
+        UPSTREAM_ERRORS.inc(method, tpl, "http_5xx")
+    if size is not None:
+        UPSTREAM_RESPONSE_SIZE.observe(size, method, tpl)
+
+
+# ===============================
+# Middleware
+# ===============================
+def init_metrics(app):
+    """
+    Mide cada request por endpoint y expone GET /metrics (texto Prometheus,
+    solo datos en memoria del proceso). METRICS_ENABLED=0 lo apaga.
+    En respuestas streaming la duración es hasta que salen los headers.
+    La ruta solo se registra con METRICS_TOKEN y exige
+    `Authorization: Bearer <token>` (expone paths del backend y tasas de error).
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe(response):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is not None:
+            endpoint = request.endpoint or "unmatched"
+            HTTP_DURATION.observe(time.perf_counter() - t0, endpoint, request.method, str(response.status_code))
+            if response.content_length is not None:
+                HTTP_RESPONSE_SIZE.observe(response.content_length, endpoint)
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc):
+        if exc is not None:
+            HTTP_EXCEPTIONS.inc(request.endpoint or "unmatched")
+
+    token = app.config.get("METRICS_TOKEN") or ""
+    if not token:
+        get_logger("metrics").warning(
+            "METRICS_TOKEN vacío: se mide igual pero no se expone %s", app.config.get("METRICS_PATH", "/metrics"))
+        return
+    expected = f"Bearer {token}".encode()
+
+    def metrics_view():
+        given = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(given, expected):
+            return Response("unauthorized\n", status=401, mimetype="text/plain",
+                            headers={"WWW-Authenticate": "Bearer"})
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule(app.config.get("METRICS_PATH", "/metrics"), "metrics", metrics_view)
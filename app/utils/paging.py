@@ -0,0 +1,215 @@
+# app/utils/paging.py
+import time
+
+from .api import get
+from .logs import get_logger
+
+log = get_logger("paging")
+
+# Campos por los que se puede ordenar (server-side)
+CASE_SORT_FIELDS = ("id", "created_at", "updated_at", "state", "case_type")
+# Filtros que se reenvían al backend y se aplican localmente si no los soporta
+CASE_FILTERS = ("case_type", "state")
+
+# ¿El backend respeta offset en cada path? path -> (bool, cuándo se probó).
+# Si no lo respeta se vuelve a probar cada _OFFSET_REPROBE_SECONDS.
+_OFFSET_SUPPORT: dict = {}
+_OFFSET_REPROBE_SECONDS = 600
+
+
+class PageRequest:
+    """
+    Parámetros de paginación ya validados (página 1-based, tamaño acotado).
+    """
+    __slots__ = ("page", "page_size", "sort", "order", "cursor", "filters")
+
+    def __init__(self, page=1, page_size=50, sort="id", order="desc", cursor=None, filters=None):
+        self.page = page
+        self.page_size = page_size
+        self.sort = sort
+        self.order = order
+        self.cursor = cursor
+        self.filters = filters or {}
+
+    @property
+    def offset(self) -> int:
+        return (self.page - 1) * self.page_size
+
+
+class Page:
+    """
+    Una página de resultados.
+    - total: None si el backend pagina y no informa el total.
+    - next_cursor: si el backend pagina por cursor.
+    """
+    __slots__ = ("items", "page", "page_size", "total", "has_next", "next_cursor")
+
+    def __init__(self, items, page, page_size, total=None, has_next=False, next_cursor=None):
+        self.items = items
+        self.page = page
+        self.page_size = page_size
+        self.total = total
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+
+    @property
+    def next_page(self):
+        return self.page + 1 if self.has_next else None
+
+    def meta(self) -> dict:
+        return {
+            "page": self.page,
+            "page_size": self.page_size,
+            "total": self.total,
+            "has_next": self.has_next,
+            "next_page": self.next_page,
+            "next_cursor": self.next_cursor,
+        }
+
+
+def _int_arg(args, name, default, lo, hi):
+    try:
+        v = int(args.get(name, default))
+    except (TypeError, ValueError):
+        v = default
+    return max(lo, min(hi, v))
+
+
+def parse_page_request(args, *, default_size=50, max_size=200, default_sort="id",
+                       default_order="desc", sort_fields=CASE_SORT_FIELDS,
+                       filters=CASE_FILTERS) -> PageRequest:
+    """
+    Lee page/page_size/sort/order/cursor (+ filtros) de request.args con límites.
+    """
+    sort = args.get("sort") or default_sort
+    if sort not in sort_fields:
+        sort = default_sort
+    order = (args.get("order") or default_order).lower()
+    if order not in ("asc", "desc"):
+        order = default_order
+    return PageRequest(
+        page=_int_arg(args, "page", 1, 1, 1_000_000),
+        page_size=_int_arg(args, "page_size", default_size, 1, max_size),
+        sort=sort,
+        order=order,
+        cursor=args.get("cursor") or None,
+        filters={k: args.get(k) for k in filters if args.get(k)},
+    )
+
+
+def sort_key(field):
+    # None al final; números antes que strings para no comparar tipos distintos
+    def key(item):
+        v = item.get(field)
+        if v is None:
+            return (2, "")
+        if isinstance(v, (int, float)):
+            return (0, v)
+        return (1, str(v))
+    return key
+
+
+def window(items: list, req: PageRequest, presorted: bool = False) -> Page:
+    """
+    Pagina localmente una lista completa: filtra, ordena y recorta.
+    Con presorted=True se asume que `items` ya viene en el orden pedido.
+    """
+    if req.filters:
+        rows = [
+            it for it in items
+            if all(str(it.get(k) or "").upper() == str(v).upper() for k, v in req.filters.items())
+        ]
+    else:
+        rows = items if presorted else list(items)
+    if not presorted:
+        rows.sort(key=sort_key(req.sort), reverse=(req.order == "desc"))
+    total = len(rows)
+    chunk = rows[req.offset:req.offset + req.page_size]
+    return Page(chunk, req.page, req.page_size, total=total,
+                has_next=req.offset + req.page_size < total)
+
+
+def _get_items(path: str, params: dict, headers: dict, items_key: str):
+    r = get(path, params=params, headers=headers)
+    data = r.json() if getattr(r, "ok", False) else {}
+    if not isinstance(data, dict):
+        data = {items_key: data if isinstance(data, list) else []}
+    return data, data.get(items_key) or []
+
+
+def _offset_supported(path: str, headers: dict, req: PageRequest, items: list, items_key: str) -> bool:
+    """
+    ¿El backend aplicó el offset? Se prueba una vez por path con una fila:
+    - en la página 1, offset=1 tiene que devolver la segunda fila;
+    - en otra página, offset=0 no puede devolver la misma primera fila.
+    """
+    known = _OFFSET_SUPPORT.get(path)
+    if known is not None and (known[0] or time.monotonic() - known[1] < _OFFSET_REPROBE_SECONDS):
+        return known[0]
+    if req.offset == 0 and len(items) < 2:
+        return True  # nada que comparar (y no hay más páginas)
+
+    probe_params = {"limit": 1, "offset": 1 if req.offset == 0 else 0,
+                    "sort": req.sort, "order": req.order, **req.filters}
+    try:
+        _, probe = _get_items(path, probe_params, headers, items_key)
+    except Exception as e:
+        log.warning("prueba de offset en %s falló: %s", path, e)
+        return True  # error transitorio: no marcamos nada
+    if req.offset == 0:
+        supported = probe[:1] == items[1:2]
+    else:
+        supported = bool(probe) and probe[:1] != items[:1]
+    if not supported:
+        log.info("%s ignora limit/offset: se pagina localmente", path)
+    _OFFSET_SUPPORT[path] = (supported, time.monotonic())
+    return supported
+
+
+def fetch_page(path: str, headers: dict, req: PageRequest, items_key: str = "items") -> Page:
+    """
+    Pide una página al backend con limit/offset/sort/order (y cursor si hay).
+
+    - Si el backend pagina (informa total / next_cursor / has_more) se usa tal cual.
+    - Si devuelve más filas que las pedidas, ignoró los parámetros: se pagina localmente.
+    - Si no informa nada y devolvió la página llena (o una página > 1), se
+      verifica (una vez por path) que respete offset. Si no lo respeta, se
+      pide la lista completa y se pagina localmente, con has_next correcto
+      (si no, cada "siguiente" repetiría la página 1).
+    """
+    params = {
+        "limit": req.page_size,
+        "offset": req.offset,
+        "sort": req.sort,
+        "order": req.order,
+        **req.filters,
+    }
+    if req.cursor:
+        params["cursor"] = req.cursor
+
+    data, items = _get_items(path, params, headers, items_key)
+
+    if data.get("total") is not None or "next_cursor" in data or "has_more" in data:
+        total = data.get("total")
+        next_cursor = data.get("next_cursor")
+        has_next = bool(data.get("has_more")) or bool(next_cursor) or (
+            total is not None and req.offset + len(items) < int(total))
+        return Page(items, req.page, req.page_size, total=total,
+                    has_next=has_next, next_cursor=next_cursor)
+
+    if len(items) > req.page_size:
+        return window(items, req)
+
+    if req.page == 1 and len(items) < req.page_size:
+        return window(items, req)  # entra todo en la primera página
+
+    if not _offset_supported(path, headers, req, items, items_key):
+        full_params = {k: v for k, v in params.items() if k not in ("limit", "offset", "cursor")}
+        _, all_items = _get_items(path, full_params, headers, items_key)
+        return window(all_items, req)
+
+    page = window(items, PageRequest(1, req.page_size, req.sort, req.order, filters=req.filters))
+    page.page = req.page
+    page.total = None
+    page.has_next = len(items) == req.page_size
+    return page
@@ -0,0 +1,75 @@
+# app/utils/proxy.py
+from flask import Response, request, stream_with_context, jsonify
+
+from .api import _request
+
+# Tamaño de cada chunk reenviado al cliente
+CHUNK_SIZE = 64 * 1024
+
+# Headers del upstream que se copian tal cual a la respuesta
+_FORWARDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+def _is_json(content_type: str | None) -> bool:
+    ct = (content_type or "").split(";")[0].strip().lower()
+    return ct == "application/json" or ct.endswith("+json")
+
+
+def stream_response(r, *, chunk_size: int = CHUNK_SIZE) -> Response:
+    """
+    Convierte un requests.Response abierto con stream=True en una respuesta
+    Flask que reenvía los bytes del upstream sin decodificar el JSON.
+
+    - Conserva status y Content-Type.
+    - Si el upstream vino comprimido y el cliente acepta esa codificación,
+      se reenvían los bytes comprimidos tal cual (sin descomprimir/recomprimir).
+    """
+    headers = {h: r.headers[h] for h in _FORWARDED_HEADERS if h in r.headers}
+    headers.setdefault("Content-Type", "application/json")
+
+    encoding = (r.headers.get("Content-Encoding") or "").strip().lower()
+    raw_passthrough = bool(encoding) and encoding in (request.headers.get("Accept-Encoding") or "").lower()
+
+    if raw_passthrough:
+        headers["Content-Encoding"] = encoding
+        chunks = r.raw.stream(chunk_size, decode_content=False)
+    else:
+        chunks = r.iter_content(chunk_size)
+
+    # Solo sabemos el largo exacto si no hay que descomprimir
+    if "Content-Length" in r.headers and (raw_passthrough or not encoding):
+        headers["Content-Length"] = r.headers["Content-Length"]
+
+    def generate():
+        try:
+            for chunk in chunks:
+                if chunk:
+                    yield chunk
+        finally:
+            r.close()
+
+    return Response(stream_with_context(generate()), status=r.status_code, headers=headers)
+
+
+def passthrough(method: str, path: str, *, json=None, params=None, headers=None,
+                json_errors: bool = False, error_label: str = "backend no devolvió JSON"):
+    """
+    Proxy genérico web -> backend que no parsea el body: hace la llamada con
+    stream=True y reenvía los bytes en chunks.
+
+    Con `json_errors=True`, si el upstream NO responde JSON (p. ej. HTML de
+    error) se devuelve el JSON de error habitual {"ok": False, ...} en vez del
+    body crudo, para que el front siempre pueda hacer r.json().
+    """
+    r = _request(method, path, json=json, params=params, headers=headers, stream=True)
+
+    if json_errors and not _is_json(r.headers.get("Content-Type")):
+        status = r.status_code
+        r.close()
+        return jsonify({
+            "ok": False,
+            "error": error_label,
+            "status_code": status,
+        }), status
+
+    return stream_response(r)
@@ -0,0 +1,288 @@
+# app/utils/resilience.py
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from flask import current_app, jsonify, render_template, request
+
+from .metrics import register_collector
+
+# Estados del breaker
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """
+    El breaker de ese path del backend está abierto: la llamada se rechaza
+    sin ir a la red. Hereda de ConnectionError para que los `except` de
+    errores de red existentes lo traten igual.
+    """
+    metric_kind = "circuit_open"
+
+    def __init__(self, path: str, retry_after: float):
+        self.path = path
+        self.retry_after = max(1, int(round(retry_after)))
+        super().__init__(
+            f"El backend no está respondiendo en {path}; reintentá en {self.retry_after} s"
+        )
+
+
+class CircuitBreaker:
+    """
+    Breaker por path del backend:
+    - closed: pasa todo; `failure_threshold` fallas seguidas lo abren.
+    - open: rechaza al instante durante `open_seconds` (se duplica en cada
+      reapertura hasta `max_open_seconds`).
+    - half_open: deja pasar una sola llamada de prueba; si sale bien se
+      cierra, si falla vuelve a abrirse.
+    Fallas = errores de red/timeout y 5xx; los 4xx no cuentan.
+    """
+
+    def __init__(self, failure_threshold: int = 5, open_seconds: float = 10.0, max_open_seconds: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.open_seconds = open_seconds
+        self.opened_at = 0.0
+        self.probing = False
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self, path: str):
+        """Lanza UpstreamUnavailable si la llamada no debe salir."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN:
+                remaining = self.opened_at + self.open_seconds - now
+                if remaining > 0:
+                    self.rejected += 1
+                    raise UpstreamUnavailable(path, remaining)
+                self.state = HALF_OPEN
+                self.probing = False
+            # half_open: una sola prueba en vuelo
+            if self.probing:
+                self.rejected += 1
+                raise UpstreamUnavailable(path, 1)
+            self.probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.probing = False
+                self.open_seconds = self.base_open_seconds
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def release_probe(self):
+        # La prueba terminó sin veredicto (p.ej. 4xx): se permite otra
+        with self._lock:
+            self.probing = False
+
+    @property
+    def closed(self) -> bool:
+        # Con el breaker abierto (o probando) no tiene sentido reintentar
+        return self.state == CLOSED
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "rejected": self.rejected,
+                    "open_seconds": self.open_seconds}
+
+
+class LatencyTracker:
+    """
+    Últimas `size` latencias exitosas de un path. El timeout sugerido es
+    p99 * factor, acotado a [floor, ceiling]; hasta tener `min_samples`
+    se usa el ceiling (el timeout fijo de siempre).
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.samples: deque = deque(maxlen=size)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float | None:
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+    def timeout(self, factor: float, floor: float, ceiling: float) -> float:
+        p99 = self.percentile(99)
+        if p99 is None:
+            return ceiling
+        return max(floor, min(ceiling, p99 * factor))
+
+
+class RetryBudget:
+    """
+    Presupuesto global de reintentos: cada request suma `ratio` tokens
+    (hasta `max_tokens`) y cada reintento consume uno. Con el backend caído
+    los reintentos se cortan solos en vez de multiplicar la carga.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.spent = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                self.spent += 1
+                return True
+            self.denied += 1
+            return False
+
+
+class Resilience:
+    """
+    Breakers y latencias por path template del backend + presupuesto de
+    reintentos compartido por todo el proceso.
+    """
+
+    def __init__(self, *, failure_threshold=5, open_seconds=10.0, max_open_seconds=120.0,
+                 timeout_factor=3.0, timeout_floor=2.0, latency_window=200, min_samples=20,
+                 retries=2, retry_backoff=0.2, budget_ratio=0.1, budget_max=20.0):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.timeout_factor = timeout_factor
+        self.timeout_floor = timeout_floor
+        self.latency_window = latency_window
+        self.min_samples = min_samples
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.budget = RetryBudget(budget_ratio, budget_max)
+        self._breakers: dict = {}
+        self._latency: dict = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, path: str) -> CircuitBreaker:
+        b = self._breakers.get(path)
+        if b is None:
+            with self._lock:
+                b = self._breakers.setdefault(path, CircuitBreaker(
+                    self.failure_threshold, self.open_seconds, self.max_open_seconds))
+        return b
+
+    def latency(self, method: str, path: str) -> LatencyTracker:
+        key = (method, path)
+        t = self._latency.get(key)
+        if t is None:
+            with self._lock:
+                t = self._latency.setdefault(key, LatencyTracker(self.latency_window, self.min_samples))
+        return t
+
+    def timeout(self, method: str, path: str, ceiling: float) -> float:
+        return self.latency(method, path).timeout(self.timeout_factor, self.timeout_floor, ceiling)
+
+    def backoff(self, attempt: int) -> float:
+        # Exponencial con full jitter: [0, base * 2^attempt]
+        return random.uniform(0, self.retry_backoff * (2 ** attempt))
+
+    def stats(self) -> dict:
+        open_now = sum(1 for b in list(self._breakers.values()) if b.state != CLOSED)
+        rejected = sum(b.rejected for b in list(self._breakers.values()))
+        return {
+            "breakers": len(self._breakers),
+            "breakers_open": open_now,
+            "rejected": rejected,
+            "retry_tokens": self.budget.tokens,
+            "retries_spent": self.budget.spent,
+            "retries_denied": self.budget.denied,
+        }
+
+
+_RESILIENCE: Resilience | None = None
+_RESILIENCE_LOCK = threading.Lock()
+
+
+def resilience() -> Resilience:
+    """
+    Breakers/timeouts/presupuesto del proceso; se crea la primera vez con la config de la app.
+    """
+    global _RESILIENCE
+    if _RESILIENCE is None:
+        with _RESILIENCE_LOCK:
+            if _RESILIENCE is None:
+                cfg = current_app.config
+                _RESILIENCE = Resilience(
+                    failure_threshold=cfg.get("BREAKER_FAILURES", 5),
+                    open_seconds=cfg.get("BREAKER_OPEN_SECONDS", 10),
+                    max_open_seconds=cfg.get("BREAKER_MAX_OPEN_SECONDS", 120),
+                    timeout_factor=cfg.get("API_TIMEOUT_FACTOR", 3.0),
+                    timeout_floor=cfg.get("API_TIMEOUT_FLOOR", 2.0),
+                    latency_window=cfg.get("API_LATENCY_WINDOW", 200),
+                    min_samples=cfg.get("API_LATENCY_MIN_SAMPLES", 20),
+                    retries=cfg.get("API_GET_RETRIES", 2),
+                    retry_backoff=cfg.get("API_RETRY_BACKOFF", 0.2),
+                    budget_ratio=cfg.get("API_RETRY_BUDGET_RATIO", 0.1),
+                    budget_max=cfg.get("API_RETRY_BUDGET_MAX", 20),
+                )
+    return _RESILIENCE
+
+
+register_collector("upstream", lambda: _RESILIENCE.stats() if _RESILIENCE else None,
+                   prefix="selva_resilience", label="scope")
+
+
+def wants_json() -> bool:
+    """
+    ¿La request actual espera JSON? (fetch/XHR, APIs del front, ?format=rows)
+    """
+    if request.method != "GET" or "/api/" in request.path or request.args.get("format") == "rows":
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", "text/html"])
+    return best == "application/json" and request.accept_mimetypes[best] > request.accept_mimetypes["text/html"]
+
+
+def upstream_unavailable_response(e: UpstreamUnavailable):
+    """
+    Respuesta 503 para una llamada rechazada por el breaker: JSON
+    {"ok": False, ...} para el front o la página de error para navegación.
+    """
+    headers = {"Retry-After": str(e.retry_after)}
+    if wants_json():
+        return jsonify({
+            "ok": False,
+            "error": str(e),
+            "upstream": e.path,
+            "retry_after": e.retry_after,
+        }), 503, headers
+    return render_template("errors/upstream.html", error=e), 503, headers
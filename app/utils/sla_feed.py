@@ -0,0 +1,271 @@
+# app/utils/sla_feed.py
+import queue
+import threading
+import time
+from functools import partial
+
+from flask import current_app
+
+from .api import get, fan_out
+from .config_cache import token_scope
+from .fragments import content_hash
+from .logs import get_logger
+from .metrics import register_collector
+
+log = get_logger("sla_feed")
+
+
+class BreachSnapshot:
+    """
+    Set de SLA vencidos de un scope tal como lo devolvió el backend.
+    `version` es el hash del contenido: cambia solo si cambió el set.
+    """
+    __slots__ = ("items", "version", "fetched_at", "ok")
+
+    def __init__(self, items: list, fetched_at: float, ok: bool = True):
+        self.items = items
+        self.version = content_hash(items)
+        self.fetched_at = fetched_at
+        self.ok = ok
+
+    @property
+    def count(self) -> int:
+        return len(self.items)
+
+
+class _Scope:
+    __slots__ = ("headers", "snapshot", "subscribers", "lock")
+
+    def __init__(self):
+        self.headers: dict | None = None  # solo mientras haya streams abiertos
+        self.snapshot: BreachSnapshot | None = None
+        self.subscribers: set = set()
+        self.lock = threading.Lock()
+
+
+class SlaBreachFeed:
+    """
+    Snapshot compartido de SLA vencidos de un endpoint del backend (`path`)
+    por scope (token), con avisos de cambios a los streams abiertos:
+
+    - Las vistas leen el snapshot si tiene menos de `interval` segundos; si
+      no, lo traen en el momento con el token de la request (sin guardarlo).
+    - Mientras un scope tiene streams abiertos (/sla/stream) el poller del
+      proceso lo refresca cada `interval` segundos con el token de esos
+      streams y, si el set cambió, les avisa.
+    - Cuando se cierra el último stream del scope se descarta el token y el
+      poller deja de consultarlo; el snapshot (sin credenciales) se olvida
+      en cuanto vence.
+
+    N pantallas abiertas del mismo scope cuestan una llamada por intervalo.
+    """
+
+    def __init__(self, app, path: str, interval: float = 15, max_scopes: int = 100, workers: int = 4):
+        self.app = app
+        self.path = path
+        self.interval = interval
+        self.max_scopes = max_scopes
+        self.workers = workers
+        self._scopes: dict[str, _Scope] = {}
+        self._lock = threading.Lock()
+        self._poller: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.polls = 0
+        self.sync_loads = 0
+        self.changes = 0
+        self.errors = 0
+
+    # --- lectura (vistas) ---
+
+    def snapshot(self, headers: dict) -> BreachSnapshot:
+        """
+        Snapshot del scope de `headers`. Si no hay uno reciente lo trae del
+        backend en el momento; las excepciones (p.ej. UpstreamUnavailable) se
+        propagan solo si no hay ninguno anterior para servir.
+        """
+        key = token_scope(headers)
+        st = self._scope(key)
+        # Con streams abiertos lo mantiene el poller: se tolera algo de atraso
+        max_age = 3 * self.interval if st.subscribers else self.interval
+        if not self._fresh(st.snapshot, max_age=max_age):
+            with st.lock:  # una sola carga en vuelo por scope
+                if not self._fresh(st.snapshot, max_age=max_age):
+                    self.sync_loads += 1
+                    self._refresh(key, st, headers)
+        return st.snapshot
+
+    def current(self, key: str) -> BreachSnapshot | None:
+        st = self._scopes.get(key)
+        return st.snapshot if st is not None else None
+
+    # --- suscripciones (SSE) ---
+
+    def subscribe(self, headers: dict) -> tuple[str, queue.Queue]:
+        """
+        Registra un stream: la cola recibe un aviso cada vez que cambia el set.
+        Mientras haya streams abiertos el scope se sigue refrescando con su token.
+        """
+        key = token_scope(headers)
+        events: queue.Queue = queue.Queue(maxsize=1)  # avisos coalescidos: el stream lee current()
+        with self._lock:
+            st = self._scope_locked(key)
+            st.headers = headers
+            st.subscribers.add(events)
+        self._ensure_poller()
+        return key, events
+
+    def unsubscribe(self, key: str, events: queue.Queue):
+        """Baja de un stream; con el último se descarta el token del scope."""
+        with self._lock:
+            st = self._scopes.get(key)
+            if st is not None:
+                st.subscribers.discard(events)
+                if not st.subscribers:
+                    st.headers = None
+
+    # --- poller ---
+
+    def poll_once(self):
+        """Refresca los scopes con streams abiertos y olvida los demás ya vencidos."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, st in self._scopes.items()
+                        if not st.subscribers and not self._fresh(st.snapshot, now)]:
+                del self._scopes[key]
+            # Los que una vista acaba de cargar no se repiten en esta vuelta
+            due = {k: (st, st.headers) for k, st in self._scopes.items()
+                   if st.subscribers and (st.snapshot is None
+                                          or now - st.snapshot.fetched_at >= self.interval * 0.9)}
+        if not due:
+            return
+        self.polls += 1
+        with self.app.app_context():
+            results = fan_out(
+                {key: partial(self._refresh_locked, key, st, headers) for key, (st, headers) in due.items()},
+                max_concurrency=self.workers,
+                timeout=max(self.interval, 5),
+            )
+        for key, res in results.items():
+            if res.error is not None:
+                log.warning("poll SLA %s falló: %s", key, res.error)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception:
+                log.exception("poller SLA")
+
+    def _ensure_poller(self):
+        if self._poller is not None and self._poller.is_alive():
+            return
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._run, name=f"sla-poller {self.path}", daemon=True)
+                self._poller.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # --- internos ---
+
+    def _fresh(self, snap: BreachSnapshot | None, now: float | None = None, max_age: float | None = None) -> bool:
+        return snap is not None and (now or time.time()) - snap.fetched_at < (max_age or self.interval)
+
+    def _scope(self, key: str) -> _Scope:
+        with self._lock:
+            return self._scope_locked(key)
+
+    def _scope_locked(self, key: str) -> _Scope:
+        st = self._scopes.get(key)
+        if st is None:
+            if len(self._scopes) >= self.max_scopes:
+                idle = [k for k, s in self._scopes.items() if not s.subscribers]
+                if idle:
+                    del self._scopes[idle[0]]  # el más viejo: el dict respeta el orden de alta
+            st = self._scopes[key] = _Scope()
+        return st
+
+    def _refresh_locked(self, key: str, st: _Scope, headers: dict):
+        with st.lock:
+            self._refresh(key, st, headers)
+
+    def _refresh(self, key: str, st: _Scope, headers: dict):
+        """Trae el set del backend y avisa si cambió. Llamar con st.lock tomado."""
+        try:
+            r = get(self.path, headers=headers)
+            data = r.json() if r.ok else None
+        except Exception:
+            self.errors += 1
+            if st.snapshot is None:
+                raise
+            log.warning("SLA %s: se sigue sirviendo el snapshot anterior", key, exc_info=True)
+            return
+        if not isinstance(data, dict):
+            self.errors += 1
+            log.warning("GET %s -> %s sin items", self.path, r.status_code)
+            if st.snapshot is None:
+                st.snapshot = BreachSnapshot([], time.time(), ok=False)
+            return
+
+        new = BreachSnapshot(data.get("items") or [], time.time())
+        old = st.snapshot
+        st.snapshot = new
+        if old is None or old.version == new.version:
+            return
+        self.changes += 1
+        with self._lock:
+            subscribers = list(st.subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(new.version)
+            except queue.Full:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "scopes": len(self._scopes),
+                "subscribers": sum(len(st.subscribers) for st in self._scopes.values()),
+                "polls": self.polls,
+                "sync_loads": self.sync_loads,
+                "changes": self.changes,
+                "errors": self.errors,
+            }
+
+
+# Cada vista lee su endpoint: /sla/ el listado completo, el dashboard el
+# de /api/sla/breaches (solo usa el conteo). Un feed (y un poller) por vista.
+_FEED_PATHS = {
+    "list": ("SLA_BREACHES_PATH", "/api/cases/sla-breaches"),
+    "dashboard": ("SLA_DASHBOARD_PATH", "/api/sla/breaches"),
+}
+_FEEDS: dict[str, SlaBreachFeed] = {}
+_FEEDS_LOCK = threading.Lock()
+
+
+def sla_feed(name: str = "list") -> SlaBreachFeed:
+    """
+    Feed de SLA vencidos del proceso para la vista `name` ("list" |
+    "dashboard"); se crea la primera vez con la config de la app. El poller
+    arranca con el primer stream de cada worker.
+    """
+    feed = _FEEDS.get(name)
+    if feed is None:
+        with _FEEDS_LOCK:
+            feed = _FEEDS.get(name)
+            if feed is None:
+                cfg = current_app.config
+                path_key, default_path = _FEED_PATHS[name]
+                feed = _FEEDS[name] = SlaBreachFeed(
+                    current_app._get_current_object(),
+                    cfg.get(path_key, default_path),
+                    interval=cfg.get("SLA_POLL_INTERVAL", 15),
+                    max_scopes=cfg.get("SLA_FEED_SCOPES", 100),
+                    workers=cfg.get("SLA_POLL_WORKERS", 4),
+                )
+    return feed
+
+
+for _name in _FEED_PATHS:
+    register_collector(f"sla_feed_{_name}", lambda name=_name: _FEEDS[name].stats() if name in _FEEDS else None)
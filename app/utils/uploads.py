@@ -1,7 +1,12 @@
-import requests
-from .api import post
+import io
+import os
+from functools import partial
+
+from .api import post, request_url
 from .auth import auth_header
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 def presign_attachment(case_id: int, filename: str, content_type: str, token: str):
     r = post(f"/api/cases/{case_id}/attachments/presign",
              json={"filename": filename, "content_type": content_type},
@@ -10,7 +15,49 @@ def presign_attachment(case_id: int, filename: str, content_type: str, token: st
     return r.json()  # { upload_url, final_key, ... }
 
 def upload_binary_to_presigned_url(upload_url: str, blob: bytes, content_type: str):
-    rr = requests.put(upload_url, data=blob, headers={"Content-Type": content_type}, timeout=120)
+    rr = request_url("PUT", upload_url, data=blob, headers={"Content-Type": content_type}, timeout=120)
+    rr.raise_for_status()
+
+class _SizedStream:
+    """Iterable de bytes de tamaño conocido: requests lo manda con Content-Length, sin chunked."""
+
+    def __init__(self, chunks, size: int):
+        self.chunks = chunks
+        self.size = size
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def __len__(self):
+        return self.size
+
+def _remaining_size(f) -> int | None:
+    try:
+        return os.fstat(f.fileno()).st_size - f.tell()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        pos = f.tell()
+        end = f.seek(0, io.SEEK_END)
+        f.seek(pos)
+        return end - pos
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+def upload_stream_to_presigned_url(upload_url: str, body, content_type: str, size: int | None = None):
+    """
+    Como upload_binary_to_presigned_url pero sin tener el archivo entero en
+    memoria: `body` es un file-like (se lee de a UPLOAD_CHUNK_SIZE) o un
+    iterable/generador de bytes. Si se conoce el tamaño (`size`, o el que
+    queda en el archivo) va con Content-Length; si no, en chunked, que las
+    URLs presignadas de S3 no aceptan: en ese caso pasar `size`.
+    """
+    if hasattr(body, "read"):
+        if size is None:
+            size = _remaining_size(body)
+        body = iter(partial(body.read, UPLOAD_CHUNK_SIZE), b"")
+    data = _SizedStream(body, size) if size is not None else iter(body)
+    rr = request_url("PUT", upload_url, data=data, headers={"Content-Type": content_type}, timeout=120)
     rr.raise_for_status()
 
 def commit_attachment(case_id: int, final_key: str, token: str):
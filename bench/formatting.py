@@ -0,0 +1,132 @@
+# bench/formatting.py
+"""
+Micro-benchmark: helpers de formato anteriores vs utils/formatting.py.
+
+    python -m bench.formatting [--rows 10000] [--distinct 500] [--repeat 5]
+
+Genera filas tipo /api/cases con `distinct` timestamps distintos (los
+listados repiten mucho los mismos valores) y montos aleatorios.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+from app.utils import formatting
+
+
+# --- Implementaciones anteriores (referencia) ---
+
+def legacy_utc_to_asuncion(iso_ts):
+    if not iso_ts:
+        return "-"
+    iso_ts = iso_ts.replace("Z", "+00:00")
+    dt = datetime.fromisoformat(iso_ts)
+    if dt.tzinfo is None:
+        dt = pytz.utc.localize(dt)
+    asu = dt.astimezone(pytz.timezone("America/Asuncion"))
+    return asu.strftime("%Y-%m-%d %H:%M")
+
+
+def legacy_format_timestamp_local(src_iso):
+    disp = src_iso
+    try:
+        dt = datetime.fromisoformat((src_iso or "").replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        disp = dt.astimezone().strftime("%d/%m/%Y")
+    except Exception:
+        pass
+    return src_iso, disp
+
+
+def legacy_numfmt(value, decimals=0):
+    try:
+        n = float(value)
+    except (TypeError, ValueError):
+        return value
+    s = f"{{:,.{decimals}f}}".format(n)
+    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
+    if decimals == 0:
+        s = s.split(',')[0]
+    return s
+
+
+# --- Datos ---
+
+def make_rows(n: int, distinct: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    stamps = [(base + timedelta(minutes=rnd.randrange(525600))).strftime("%Y-%m-%dT%H:%M:%SZ")
+              for _ in range(distinct)]
+    return [{
+        "id": i,
+        "updated_at": rnd.choice(stamps),
+        "amount": rnd.uniform(1, 10_000_000),
+    } for i in range(n)]
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--distinct", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    rows = make_rows(args.rows, args.distinct)
+    vals = [r["updated_at"] for r in rows]
+    amounts = [r["amount"] for r in rows]
+
+    def cold(fn):
+        # Vacía los memos antes de cada corrida: mide también el primer render
+        def run():
+            formatting.parse_iso.cache_clear()
+            formatting._format_ts.cache_clear()
+            fn()
+        return run
+
+    cases = [
+        ("utc_to_asuncion",
+         lambda: [legacy_utc_to_asuncion(v) for v in vals],
+         cold(lambda: [formatting.format_ts(v, "%Y-%m-%d %H:%M", "America/Asuncion") for v in vals])),
+        ("dashboard display (por fila)",
+         lambda: [legacy_format_timestamp_local(v) for v in vals],
+         cold(lambda: [formatting.format_ts(v, "%d/%m/%Y", "America/Asuncion") for v in vals])),
+        ("dashboard display (columna)",
+         lambda: [legacy_format_timestamp_local(v) for v in vals],
+         cold(lambda: formatting.format_column(rows, "updated_at", "updated_at_display",
+                                               "%d/%m/%Y", "America/Asuncion"))),
+        ("numfmt(2)",
+         lambda: [legacy_numfmt(a, 2) for a in amounts],
+         lambda: [formatting.numfmt(a, 2) for a in amounts]),
+        ("numfmt(0)",
+         lambda: [legacy_numfmt(a, 0) for a in amounts],
+         lambda: [formatting.numfmt(a, 0) for a in amounts]),
+    ]
+
+    # Mismo resultado que antes (con TZ fija)
+    assert [legacy_numfmt(a, 2) for a in amounts[:200]] == [formatting.numfmt(a, 2) for a in amounts[:200]]
+    assert [legacy_utc_to_asuncion(v) for v in vals[:200]] == \
+        [formatting.format_ts(v, "%Y-%m-%d %H:%M", "America/Asuncion") for v in vals[:200]]
+
+    print(f"{args.rows} filas, {args.distinct} timestamps distintos, mejor de {args.repeat}\n")
+    print(f"{'caso':32} {'antes ms':>10} {'ahora ms':>10} {'x':>7}")
+    for name, old, new in cases:
+        t_old = timeit(old, args.repeat) * 1000
+        t_new = timeit(new, args.repeat) * 1000
+        print(f"{name:32} {t_old:10.2f} {t_new:10.2f} {t_old / t_new:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
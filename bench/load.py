@@ -0,0 +1,294 @@
+# bench/load.py
+"""
+Prueba de carga de la app contra el stub local del backend.
+
+    python -m bench.load                          # todas las rutas, 8 conexiones, 200 req por ruta
+    python -m bench.load -c 32 -n 1000 --latency-ms 50 --cases 5000
+    python -m bench.load --routes dashboard,cases_list
+    python -m bench.load --app-url http://127.0.0.1:5000 --api-url http://127.0.0.1:8900
+    python -m bench.load --compare bench/results/A.json bench/results/B.json
+
+Por defecto levanta el stub (bench/stub_backend.py) y la app en proceso
+(werkzeug threaded) apuntando a él. Para cada ruta manda `-n` requests con
+`-c` en paralelo y reporta p50/p95/p99 (ms), errores y requests/s. El
+resultado se guarda en bench/results/<fecha>-<commit>.json para comparar
+entre commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from . import stub_backend
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class Route:
+    """
+    Un escenario: método + path (+ body). `path` y `body` pueden ser
+    callables que reciben el número de request (para variar ids).
+    """
+    __slots__ = ("name", "method", "path", "body", "headers")
+
+    def __init__(self, name, method, path, body=None, headers=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+
+    def build(self, i: int):
+        path = self.path(i) if callable(self.path) else self.path
+        body = self.body(i) if callable(self.body) else self.body
+        return path, body
+
+
+def routes(cases: int, customers: int) -> list:
+    cases = max(1, cases)
+    customers = max(1, customers)
+
+    def case_id(i):
+        return 1 + (i * 7919) % cases
+
+    def phone(i):
+        return f"+5959810{1 + i % customers:05d}"
+
+    return [
+        # dashboard
+        Route("dashboard", "GET", "/"),
+        Route("dashboard_rows", "GET", "/?format=rows&type=GOODS&page=2"),
+        # cases
+        Route("cases_list", "GET", "/cases/"),
+        Route("cases_list_rows", "GET", lambda i: f"/cases/?format=rows&page={2 + i % 5}"),
+        Route("case_detail", "GET", lambda i: f"/cases/{case_id(i)}"),
+        Route("case_new", "GET", "/cases/new"),
+        Route("quote_goods", "POST", "/cases/quote",
+              lambda i: {"kind": "GOODS", "items": [{"qty": 1, "cost_usd": 10 + i % 50}]}),
+        Route("quote_remit", "POST", "/cases/quote", lambda i: {"kind": "REMIT", "amount_usd": 100 + i % 20}),
+        Route("case_create", "POST", "/cases/create",
+              lambda i: {"case_type": "GOODS", "customer_id": 1 + i % customers, "title": f"bench {i}"}),
+        Route("case_update", "PATCH", lambda i: f"/cases/{case_id(i)}", {"meta": {"notes": "bench"}}),
+        Route("case_state", "POST", lambda i: f"/cases/{case_id(i)}/state", {"state": "QUOTED"}),
+        Route("case_event", "POST", lambda i: f"/cases/{case_id(i)}/event", {"type": "NOTE", "payload": "bench"}),
+        Route("customer_lookup", "GET", lambda i: f"/cases/customer-lookup?phone={phone(i)}"),
+        Route("customer_create", "POST", "/cases/customer-create",
+              lambda i: {"name": f"Bench {i}", "phone": f"+595990{i:06d}"}),
+        Route("attachment_presign", "POST", lambda i: f"/cases/{case_id(i)}/attachments/presign",
+              {"filename": "recibo.pdf", "content_type": "application/pdf"}),
+        Route("attachment_commit", "POST", lambda i: f"/cases/{case_id(i)}/attachments/commit",
+              lambda i: {"key": f"cases/{case_id(i)}/bench.pdf", "kind": "RECEIPT"}),
+        Route("attachment_presign_batch", "POST", lambda i: f"/cases/{case_id(i)}/attachments/presign-batch",
+              {"files": [{"filename": f"recibo-{k}.pdf", "content_type": "application/pdf"} for k in range(5)]}),
+        Route("attachment_commit_batch", "POST", lambda i: f"/cases/{case_id(i)}/attachments/commit-batch",
+              lambda i: {"items": [{"key": f"cases/{case_id(i)}/bench-{k}.pdf"} for k in range(5)]}),
+        # config
+        Route("config_index", "GET", "/config/"),
+        Route("config_sla", "GET", "/config/api/sla"),
+        Route("config_window", "GET", "/config/api/notification-window"),
+        Route("config_flags", "GET", "/config/api/flags"),
+        Route("config_pricing", "GET", "/config/api/pricing"),
+        Route("config_fx", "GET", "/config/api/fx"),
+        Route("config_settings", "GET", "/config/api/settings"),
+        Route("config_put_flags", "PUT", "/config/api/flags", {"enabled": True}),
+        Route("config_batch", "POST", "/api/batch", {"requests": [
+            {"id": p, "path": f"/api/config/{p}"}
+            for p in ("pricing", "fx", "sla", "notification-window", "flags", "settings", "settings/shipping_usd")
+        ]}),
+        # sla
+        Route("sla_list", "GET", "/sla/"),
+        Route("sla_notify", "POST", "/sla/notify", {}),
+        # chat
+        Route("chat_send", "POST", "/chat/api/send", lambda i: {"text": f"hola {i}", "username": "bench"}),
+        Route("chat_stream", "POST", "/chat/api/stream", lambda i: {"text": f"hola {i}", "username": "bench"},
+              {"Accept": "text/event-stream"}),
+    ]
+
+
+# ===============================
+# Ejecución
+# ===============================
+def percentile(sorted_vals: list, p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+def run_route(base_url: str, route: Route, n: int, concurrency: int, timeout: float) -> dict:
+    local = threading.local()
+    lat: list = []
+    errors = 0
+    statuses: dict = {}
+    lock = threading.Lock()
+
+    def session():
+        s = getattr(local, "s", None)
+        if s is None:
+            s = local.s = requests.Session()
+            s.cookies.set("jwt", "bench-token")
+        return s
+
+    def one(i):
+        nonlocal errors
+        path, body = route.build(i)
+        t0 = time.perf_counter()
+        try:
+            r = session().request(route.method, base_url + path, json=body, headers=route.headers,
+                                  timeout=timeout, stream=True)
+            r.content  # incluye el tiempo de bajar el body (SSE hasta el final)
+            status = r.status_code
+        except requests.RequestException:
+            status = None
+        dt = time.perf_counter() - t0
+        with lock:
+            lat.append(dt)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status is None or status >= 500:
+                errors += 1
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n)))
+    wall = time.perf_counter() - t_start
+
+    lat.sort()
+    ms = [v * 1000 for v in lat]
+    return {
+        "method": route.method,
+        "requests": n,
+        "errors": errors,
+        "statuses": statuses,
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "mean_ms": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "max_ms": round(ms[-1], 2) if ms else 0.0,
+        "rps": round(n / wall, 1) if wall else 0.0,
+    }
+
+
+def start_app(api_url: str):
+    """
+    Levanta la app en proceso (werkzeug threaded, puerto libre) contra `api_url`.
+    """
+    os.environ["API_BASE_URL"] = api_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import logging
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # sin una línea por request
+
+    app = create_app()
+    app.config["API_BASE_URL"] = api_url
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def git_info() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, timeout=10,
+                                  cwd=Path(__file__).resolve().parent).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or "unknown",
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def print_table(results: dict):
+    print(f"{'ruta':26} {'n':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9}")
+    for name, r in results.items():
+        print(f"{name:26} {r['requests']:6d} {r['errors']:5d} {r['p50_ms']:9.1f} "
+              f"{r['p95_ms']:9.1f} {r['p99_ms']:9.1f} {r['rps']:9.1f}")
+
+
+def compare(path_a: str, path_b: str):
+    a = json.loads(Path(path_a).read_text())
+    b = json.loads(Path(path_b).read_text())
+    print(f"A: {a['git']['commit']} {a['git']['subject']}")
+    print(f"B: {b['git']['commit']} {b['git']['subject']}\n")
+    print(f"{'ruta':26} {'p50 A':>9} {'p50 B':>9} {'p95 A':>9} {'p95 B':>9} {'rps A':>9} {'rps B':>9} {'Δrps':>7}")
+    for name in a["routes"]:
+        if name not in b["routes"]:
+            continue
+        ra, rb = a["routes"][name], b["routes"][name]
+        delta = (rb["rps"] / ra["rps"] - 1) * 100 if ra["rps"] else 0.0
+        print(f"{name:26} {ra['p50_ms']:9.1f} {rb['p50_ms']:9.1f} {ra['p95_ms']:9.1f} {rb['p95_ms']:9.1f} "
+              f"{ra['rps']:9.1f} {rb['rps']:9.1f} {delta:+6.0f}%")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-c", "--concurrency", type=int, default=8)
+    ap.add_argument("-n", "--requests", type=int, default=200, help="requests por ruta")
+    ap.add_argument("--routes", default="", help="lista separada por comas (por defecto todas)")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--warmup", type=int, default=5, help="requests de calentamiento por ruta")
+    ap.add_argument("--app-url", default="", help="usar una app ya levantada en vez de la de proceso")
+    ap.add_argument("--api-url", default="", help="usar un backend/stub ya levantado")
+    ap.add_argument("--out", default=str(RESULTS_DIR), help="directorio de resultados ('' para no guardar)")
+    ap.add_argument("--compare", nargs=2, metavar=("A", "B"), help="comparar dos resultados guardados")
+    stub_backend.add_arguments(ap)
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    stub_cfg = stub_backend.config_from_args(args)
+    api_url = args.api_url
+    if not api_url:
+        stub = stub_backend.start(stub_cfg)
+        api_url = f"http://127.0.0.1:{stub.server_address[1]}"
+    app_url = args.app_url
+    if not app_url:
+        _server, app_url = start_app(api_url)
+
+    selected = {r.strip() for r in args.routes.split(",") if r.strip()}
+    scenario = [r for r in routes(stub_cfg.cases, stub_cfg.customers) if not selected or r.name in selected]
+    if selected - {r.name for r in scenario}:
+        sys.exit(f"rutas desconocidas: {', '.join(sorted(selected - {r.name for r in scenario}))}")
+
+    print(f"app {app_url}  backend {api_url}  c={args.concurrency} n={args.requests}\n")
+    results = {}
+    for route in scenario:
+        if args.warmup:
+            run_route(app_url, route, args.warmup, 1, args.timeout)
+        results[route.name] = run_route(app_url, route, args.requests, args.concurrency, args.timeout)
+    print_table(results)
+
+    if args.out:
+        info = git_info()
+        out_dir = Path(args.out)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = out_dir / f"{stamp}-{info['commit']}{'-dirty' if info['dirty'] else ''}.json"
+        path.write_text(json.dumps({
+            "git": info,
+            "timestamp": stamp,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"concurrency": args.concurrency, "requests": args.requests,
+                       "app_url": args.app_url or "in-process", "api_url": args.api_url or "stub"},
+            "stub": stub_cfg.as_dict(),
+            "routes": results,
+        }, indent=2, ensure_ascii=False))
+        print(f"\nresultado: {path}")
+
+
+if __name__ == "__main__":
+    main()
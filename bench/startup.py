@@ -0,0 +1,108 @@
+# bench/startup.py
+"""
+Presupuesto de arranque en frío: import del paquete + create_app().
+
+    python -m bench.startup [--budget-ms 500] [--top 15] [--repeat 3]
+
+Corre cada medición en un intérprete nuevo (nada queda en caché entre
+corridas) y reporta:
+  - tiempo de `import app` y de create_app() (mediana de --repeat),
+  - cuánto tarda cada blueprint en cargarse (con WEB_LAZY_BLUEPRINTS lo
+    paga el primer request, no el arranque),
+  - los paquetes que más pesan (`-X importtime`, tiempo propio agregado por paquete raíz).
+Sale con código 1 si import + create_app supera el presupuesto
+(STARTUP_BUDGET_MS por defecto), para usarlo en CI.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.config import AppConfig
+
+# Se ejecuta en el intérprete hijo; imprime los tiempos como JSON en stdout
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+flask_app = app.create_app()
+t2 = time.perf_counter()
+import importlib
+blueprints = {}
+for module, _ in app._BLUEPRINTS:
+    b0 = time.perf_counter()
+    importlib.import_module(f"app.blueprints.{module}")
+    blueprints[module] = (time.perf_counter() - b0) * 1000
+app.load_blueprints(flask_app)
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "blueprints_ms": blueprints,
+    "load_blueprints_ms": (t3 - t2) * 1000,
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    # "import time:   self [us] | cumulative | imported package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def run_once(importtime: bool = False) -> tuple[dict, list]:
+    flags = ["-X", "importtime"] if importtime else []
+    proc = subprocess.run(
+        [sys.executable, *flags, "-c", _PROBE],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), _parse_importtime(proc.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-ms", type=float, default=AppConfig.STARTUP_BUDGET_MS)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    # Tiempos sin -X importtime (agrega overhead); el desglose sale de una corrida aparte
+    runs = sorted((run_once()[0] for _ in range(max(1, args.repeat))),
+                  key=lambda t: t["import_ms"] + t["create_app_ms"])
+    timings = runs[len(runs) // 2]
+    total = statistics.median(t["import_ms"] + t["create_app_ms"] for t in runs)
+    _, imports = run_once(importtime=True)
+
+    print(f"import app      {timings['import_ms']:8.1f} ms")
+    print(f"create_app()    {timings['create_app_ms']:8.1f} ms")
+    print(f"total (mediana) {total:8.1f} ms   presupuesto {args.budget_ms:.0f} ms")
+
+    # Con WEB_LAZY_BLUEPRINTS=0 esto ya está dentro de create_app()
+    print(f"\nblueprints      {timings['load_blueprints_ms']:8.1f} ms   (primer request con WEB_LAZY_BLUEPRINTS=1)")
+    for module, ms in sorted(timings["blueprints_ms"].items(), key=lambda kv: -kv[1]):
+        print(f"  {module:<12} {ms:8.1f} ms")
+
+    by_root = defaultdict(int)
+    for name, self_us, _ in imports:
+        by_root[name.split(".")[0]] += self_us
+    print(f"\ntop {args.top} paquetes por tiempo propio de import:")
+    for root, us in sorted(by_root.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {root:<24} {us / 1000:8.1f} ms")
+
+    if total > args.budget_ms:
+        print(f"\nFUERA DE PRESUPUESTO: {total:.1f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
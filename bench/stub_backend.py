@@ -0,0 +1,333 @@
+# bench/stub_backend.py
+"""
+Stub local del backend (API_BASE_URL) para benchmarks y pruebas de carga.
+
+    python -m bench.stub_backend --port 8900 --latency-ms 20 --cases 2000 --customers 300
+
+Responde los mismos paths que usan los blueprints con datos sintéticos
+deterministas. Latencia (media + jitter), cantidad de casos/clientes y
+tamaño de los payloads (ítems por caso, eventos, adjuntos, relleno) son
+configurables. No valida JWT.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CASE_TYPES = ("GOODS", "REMIT")
+STATES = ("NEW", "QUOTED", "PAID", "IN_TRANSIT", "DELIVERED", "CLOSED")
+
+
+class StubConfig:
+    __slots__ = ("latency_ms", "jitter_ms", "cases", "customers", "items_per_case",
+                 "events_per_case", "attachments_per_case", "padding", "chat_latency_ms",
+                 "stream_chat", "seed")
+
+    def __init__(self, latency_ms=20.0, jitter_ms=5.0, cases=1000, customers=200, items_per_case=3,
+                 events_per_case=5, attachments_per_case=2, padding=0, chat_latency_ms=300.0,
+                 stream_chat=False, seed=7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.cases = cases
+        self.customers = customers
+        self.items_per_case = items_per_case
+        self.events_per_case = events_per_case
+        self.attachments_per_case = attachments_per_case
+        self.padding = padding              # bytes de relleno por caso (simula payloads grandes)
+        self.chat_latency_ms = chat_latency_ms
+        self.stream_chat = stream_chat
+        self.seed = seed
+
+    def as_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class StubData:
+    """
+    Datos sintéticos generados una sola vez (deterministas por seed).
+    """
+
+    def __init__(self, cfg: StubConfig):
+        rnd = random.Random(cfg.seed)
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        pad = "x" * cfg.padding
+        self.cfg = cfg
+        self.customers = {
+            i: {"id": i, "name": f"Cliente {i}", "phone": f"+5959810{i:05d}", "email": f"c{i}@example.com"}
+            for i in range(1, cfg.customers + 1)
+        }
+        self.cases = []
+        for i in range(1, cfg.cases + 1):
+            created = base + timedelta(minutes=rnd.randrange(500_000))
+            self.cases.append({
+                "id": i,
+                "code": f"C-{i:06d}",
+                "case_type": rnd.choice(CASE_TYPES),
+                "state": rnd.choice(STATES),
+                "title": f"Caso {i}",
+                "customer_id": rnd.randint(1, cfg.customers) if cfg.customers else None,
+                "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "updated_at": (created + timedelta(minutes=rnd.randrange(10_000))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                **({"notes": pad} if pad else {}),
+            })
+        self.by_id = {c["id"]: c for c in self.cases}
+        self.lock = threading.Lock()
+
+    def detail(self, case_id: int) -> dict | None:
+        c = self.by_id.get(case_id)
+        if c is None:
+            return None
+        cfg = self.cfg
+        n = cfg.items_per_case
+        items = [{"description": f"Item {k}", "qty": 1 + k % 3, "cost_usd": 10.0 + k, "price_usd": 12.5 + k}
+                 for k in range(n)]
+        base_usd = sum(it["price_usd"] * it["qty"] for it in items) or 100.0
+        meta = {
+            "kind": c["case_type"],
+            "fee_mode": "PCT",
+            "notes": c.get("notes") or "",
+            "amounts": {
+                "base": {"usd": base_usd, "pyg": base_usd * 7300},
+                "fee": {"usd": base_usd * 0.05, "pyg": base_usd * 0.05 * 7300},
+                "total": {"usd": base_usd * 1.05, "pyg": base_usd * 1.05 * 7300},
+            },
+            "fx": {"pair": "USD/PYG", "rate": 7300},
+        }
+        if c["case_type"] == "GOODS":
+            meta["goods"] = {"items": items}
+        else:
+            meta["remit"] = {"amount_usd": base_usd}
+            meta["sender"] = {"name": "Remitente", "phone": "+1555000000", "country": "US"}
+            meta["receiver"] = {"name": "Receptor", "phone": "+595981000000", "country": "PY"}
+        return {
+            **c,
+            "customer": self.customers.get(c["customer_id"]),
+            "meta": meta,
+            "events": [{"new_state": STATES[k % len(STATES)], "prev_state": STATES[(k - 1) % len(STATES)],
+                        "actor": "bench", "created_at": c["created_at"], "payload": None}
+                       for k in range(cfg.events_per_case)],
+            "attachments": [{"key": f"cases/{case_id}/file-{k}.pdf", "url": f"https://files.example.com/{case_id}/{k}",
+                             "kind": "RECEIPT", "created_at": c["created_at"], "meta": {}}
+                            for k in range(cfg.attachments_per_case)],
+        }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    data: StubData = None  # se asigna en make_server
+
+    def log_message(self, *args):
+        pass
+
+    # --- helpers ---
+
+    def _body(self) -> dict:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            return {}
+
+    def _send(self, obj, status: int = 200):
+        b = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(b)))
+        self.end_headers()
+        self.wfile.write(b)
+
+    def _sleep(self, ms: float | None = None):
+        cfg = self.data.cfg
+        ms = cfg.latency_ms if ms is None else ms
+        if cfg.jitter_ms:
+            ms = max(0.0, ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms))
+        if ms:
+            time.sleep(ms / 1000.0)
+
+    # --- dispatch ---
+
+    def _handle(self, method: str):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        q = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        body = self._body() if method != "GET" else {}
+        seg = path.split("/")
+
+        if path == "/api/assistant/chat/stream":
+            return self._chat_stream(body)
+        if path == "/api/assistant/chat":
+            self._sleep(self.data.cfg.chat_latency_ms)
+            return self._send({"ok": True, "reply_text": f"Recibido: {body.get('text', '')}"})
+
+        self._sleep()
+        d = self.data
+
+        if path == "/api/cases" and method == "GET":
+            return self._send(self._list_cases(q))
+        if path == "/api/cases" and method == "POST":
+            return self._send({"ok": True, "case": {"id": len(d.cases) + 1, **body}}, 201)
+        if path in ("/api/cases/sla-breaches", "/api/sla/breaches"):
+            items = [{**c, "threshold_hours": 24} for c in d.cases[::50]]
+            return self._send({"items": items})
+        if len(seg) >= 4 and seg[2] == "cases" and seg[3].isdigit():
+            case_id = int(seg[3])
+            if len(seg) == 4:
+                if method == "GET":
+                    det = d.detail(case_id)
+                    return self._send({"case": det} if det else {"error": "not found"}, 200 if det else 404)
+                return self._send({"ok": True, "case": {**d.by_id.get(case_id, {}), **body}})
+            action = seg[4]
+            if action in ("state", "events"):
+                return self._send({"ok": True})
+            if action == "attachments" and len(seg) > 5:
+                if seg[5] == "presign":
+                    return self._send({"ok": True, "upload_url": f"https://files.example.com/upload/{body.get('key')}",
+                                       "key": body.get("key")})
+                return self._send({"ok": True, "attachment": {"key": body.get("key")}})
+        if path.startswith("/api/quotes/"):
+            amount = float(body.get("amount_usd") or body.get("amount") or 100)
+            return self._send({"ok": True, "amounts": {"base": {"usd": amount}, "fee": {"usd": amount * 0.05},
+                                                       "total": {"usd": amount * 1.05}}, "fx": {"rate": 7300}})
+        if path == "/api/customers/lookup":
+            phone = q.get("phone", "")
+            found = [c for c in d.customers.values() if c["phone"].startswith(phone)][:20]
+            return self._send({"ok": True, "items": found})
+        if path == "/api/customers" and method == "GET":
+            ids = [int(x) for x in q.get("ids", "").split(",") if x.isdigit()]
+            return self._send({"items": [d.customers[i] for i in ids if i in d.customers]})
+        if path == "/api/customers" and method == "POST":
+            return self._send({"ok": True, "customer": {"id": len(d.customers) + 1, **body}}, 201)
+        if len(seg) == 4 and seg[2] == "customers" and seg[3].isdigit():
+            c = d.customers.get(int(seg[3]))
+            return self._send(c if c else {"error": "not found"}, 200 if c else 404)
+        if path.startswith("/api/config/"):
+            return self._send(self._config(seg[3] if len(seg) > 3 else "", method, body))
+        if path == "/api/wa/notify":
+            return self._send({"ok": True, "sent": 0})
+        return self._send({"error": f"stub: {method} {path} no implementado"}, 404)
+
+    def _list_cases(self, q: dict) -> dict:
+        rows = self.data.cases
+        since = q.get("updated_since")
+        if since:
+            rows = [c for c in rows if c["updated_at"] > since]
+        for k in ("case_type", "state"):
+            if q.get(k):
+                rows = [c for c in rows if c[k] == q[k]]
+        if "limit" not in q:
+            return {"items": rows}
+        reverse = (q.get("order") or "desc") == "desc"
+        field = q.get("sort") or "id"
+        rows = sorted(rows, key=lambda c: c.get(field) or "", reverse=reverse) if field != "id" else (
+            rows[::-1] if reverse else rows)
+        offset, limit = int(q.get("offset") or 0), int(q["limit"])
+        return {"items": rows[offset:offset + limit], "total": len(rows)}
+
+    def _config(self, section: str, method: str, body: dict) -> dict:
+        if method != "GET":
+            return {"ok": True, **(body if isinstance(body, dict) else {})}
+        if section == "fx":
+            return {"items": [{"id": i, "pair": "USD/PYG", "rate": 7300 + i, "date": f"2025-01-{i:02d}"}
+                              for i in range(1, 29)]}
+        if section == "pricing":
+            return {"items": [{"case_type": t, "fee_pct": 5, "fee_fixed_usd": 10} for t in CASE_TYPES]}
+        if section == "settings":
+            return {"items": [{"key": f"setting_{i}", "value": str(i)} for i in range(30)]}
+        return {"ok": True, "section": section, "value": {"enabled": True, "hours": 24}}
+
+    def _chat_stream(self, body: dict):
+        if not self.data.cfg.stream_chat:
+            return self._send({"error": "no streaming"}, 404)
+        words = f"Recibido: {body.get('text', '')}".split()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        step = self.data.cfg.chat_latency_ms / 1000.0 / max(1, len(words))
+        for w in words:
+            time.sleep(step)
+            self.wfile.write(f"data: {json.dumps({'delta': w + ' '})}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b'event: done\ndata: {"ok": true}\n\n')
+        self.close_connection = True
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def make_server(cfg: StubConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Crea el servidor (port=0 elige uno libre); arrancarlo con start().
+    """
+    handler = type("BoundStubHandler", (StubHandler,), {"data": StubData(cfg)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start(cfg: StubConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Arranca el stub en un thread daemon y devuelve el server
+    (URL base: f"http://{host}:{server.server_address[1]}").
+    """
+    server = make_server(cfg, host, port)
+    threading.Thread(target=server.serve_forever, name="stub-backend", daemon=True).start()
+    return server
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    d = StubConfig()
+    ap.add_argument("--latency-ms", type=float, default=d.latency_ms, help="latencia media del backend")
+    ap.add_argument("--jitter-ms", type=float, default=d.jitter_ms)
+    ap.add_argument("--cases", type=int, default=d.cases)
+    ap.add_argument("--customers", type=int, default=d.customers)
+    ap.add_argument("--items-per-case", type=int, default=d.items_per_case)
+    ap.add_argument("--events-per-case", type=int, default=d.events_per_case)
+    ap.add_argument("--attachments-per-case", type=int, default=d.attachments_per_case)
+    ap.add_argument("--padding", type=int, default=d.padding, help="bytes extra por caso en /api/cases")
+    ap.add_argument("--chat-latency-ms", type=float, default=d.chat_latency_ms)
+    ap.add_argument("--stream-chat", action="store_true", help="ofrecer /api/assistant/chat/stream (SSE)")
+
+
+def config_from_args(args) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, cases=args.cases, customers=args.customers,
+        items_per_case=args.items_per_case, events_per_case=args.events_per_case,
+        attachments_per_case=args.attachments_per_case, padding=args.padding,
+        chat_latency_ms=args.chat_latency_ms, stream_chat=args.stream_chat,
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8900)
+    add_arguments(ap)
+    args = ap.parse_args()
+    server = make_server(config_from_args(args), args.host, args.port)
+    print(f"stub backend en http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# gunicorn.conf.py — servidor de producción (gunicorn -c gunicorn.conf.py wsgi:app)
+#
+# Valores desde AppConfig (WEB_*), así que se ajustan por env como el resto.
+# Recarga sin cortar requests:
+#   kill -HUP <master>   workers nuevos con la config releída; los viejos terminan
+#                        lo que tienen en vuelo (WEB_GRACEFUL_TIMEOUT). Con preload
+#                        NO recarga código:
+#   kill -USR2 <master>  levanta un master nuevo con el código nuevo; cuando está
+#                        arriba: kill -WINCH y luego kill -TERM al master viejo.
+import multiprocessing
+
+from dotenv import load_dotenv
+
+load_dotenv()  # como `flask run`: .env antes de que AppConfig lea el entorno
+
+from app.config import AppConfig  # noqa: E402
+
+bind = AppConfig.WEB_BIND
+workers = AppConfig.WEB_WORKERS or multiprocessing.cpu_count() * 2 + 1
+worker_class = "gthread"
+threads = AppConfig.WEB_THREADS
+timeout = AppConfig.WEB_TIMEOUT
+graceful_timeout = AppConfig.WEB_GRACEFUL_TIMEOUT
+keepalive = AppConfig.WEB_KEEPALIVE
+max_requests = AppConfig.WEB_MAX_REQUESTS
+max_requests_jitter = AppConfig.WEB_MAX_REQUESTS_JITTER
+preload_app = AppConfig.WEB_PRELOAD
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Nada de sockets compartidos con el master ni con otros workers: el pool
+    # HTTP y los executors son lazy y se crean en cada worker.
+    # El listener de logs se rearranca solo (os.register_at_fork en utils/logs.py).
+    from app.utils.api import reset_client_pool
+    reset_client_pool()
+    server.log.info("worker %s listo", worker.pid)
@@ -0,0 +1,16 @@
+# wsgi.py — entry point de producción:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# Con preload_app la app se crea una vez en el master y los workers se forkean
+# ya inicializados (arranque de cada worker ≈ fork): ahí los blueprints se
+# cargan de entrada, para que se compartan y ningún worker los importe en su
+# primer request. Sin preload quedan lazy (primer request de cada worker).
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app, load_blueprints  # noqa: E402
+from app.config import AppConfig  # noqa: E402
+
+app = create_app()
+if AppConfig.WEB_PRELOAD:
+    load_blueprints(app)